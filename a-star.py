@@ -1,7 +1,11 @@
 import time
+import struct
+import tracemalloc
 from math import sqrt
-from collections import namedtuple
-import queue
+from array import array
+from collections import namedtuple, OrderedDict
+from heapq import heappush, heappop
+import numpy as np
 
 
 def exe_time(func):
@@ -23,153 +27,1193 @@ yellow = (255, 192, 0)
 Point = namedtuple('Point', ['x', 'y'])
 
 
-class PriorityQueue(queue.PriorityQueue):
-    def _init(self, maxsize):
-        super(PriorityQueue, self)._init(maxsize)
-        self.dict = {}
+inf = float("inf")
+sqrt_2 = sqrt(2)
 
-    def _put(self, item):
-        super(PriorityQueue, self)._put(item)
-        self.dict[item] = item
+links = [
+    Point(0, -1), Point(0, 1), Point(-1, 0), Point(1, 0),
+    Point(-1, -1), Point(1, -1), Point(-1, 1), Point(1, 1),
+]
 
-    def _get(self):
-        item = super(PriorityQueue, self)._get()
-        self.dict.pop(item)
-        return item
 
+# 对角距离
+def heuristic(p, q):
+    dx = abs(p.x - q.x)
+    dy = abs(p.y - q.y)
+    return (dx + dy) + (sqrt_2 - 2) * min(dx, dy)
 
-class Position(object):
-    def __init__(self, x, y, g, h, parent=None):
-        self.x = x
-        self.y = y
-        self.g = g  # start -> current
-        self.h = h  # current -> end
-        self.parent = parent
 
-    def __add__(self, other):
-        if isinstance(other, Point):
-            return Point(x=self.x + other.x, y=self.y + other.y)
-        else:
-            raise NotImplementedError()
+def flatten(gird, long, high):
+    # 按 y * long + x 展开地形代价，ndarray 直接零拷贝地取其缓冲区
+    if isinstance(gird, np.ndarray):
+        return memoryview(np.ascontiguousarray(gird).reshape(-1))
+    return array('d', (gird[y][x] for y in range(high) for x in range(long)))
 
-    def __lt__(self, other):
-        if isinstance(other, Position):
-            return (self.g + self.h) < (other.g + other.h)
-        else:
-            raise NotImplementedError()
 
-    def __hash__(self):
-        return hash(f"{self.x},{self.y}")
+class SearchStats(object):
+    """
+    搜索统计，作为 stats= 传给各搜索后由其填写；不传时搜索直接使用 heapq，没有任何额外开销。
+
+    expanded 为扩展的结点数，pushes / pops 为堆操作次数，stale 为弹出后跳过的过期条目（在跳过处计数），
+    repushed 为 A* 类搜索中仍在 open 表的结点以更小代价再次入堆的次数，
+    underconsistent 为 D* Lite 中被置为欠一致（g 重置为 inf）的结点数，
+    max_frontier 为 open 表的最大长度，peak_memory 为搜索期间 Python 分配的峰值字节数（需 memory=True），
+    timers 为 setup / search / reconstruction 三个阶段的 perf_counter 耗时。
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale = 0
+        self.repushed = 0
+        self.underconsistent = 0
+        self.max_frontier = 0
+        self.peak_memory = 0
+        self.timers = {'setup': 0., 'search': 0., 'reconstruction': 0.}
+
+        self.labeled = 0
+        self.searches = []
+        self.mark = None
+        self.tracing = False
 
     def __repr__(self):
-        return f"({self.x},{self.y})"
+        timers = ", ".join(f"{phase}={t * 1000:.3f}ms" for phase, t in self.timers.items())
+        return (f"SearchStats(expanded={self.expanded}, pushes={self.pushes}, pops={self.pops}, "
+                f"stale={self.stale}, repushed={self.repushed}, underconsistent={self.underconsistent}, "
+                f"max_frontier={self.max_frontier}, peak_memory={self.peak_memory}, {timers})")
 
-    def __eq__(self, other):
-        if (not isinstance(other, Position)) and (not isinstance(other, Point)):
-            return False
-        return self.x == other.x and self.y == other.y
+    def counters(self):
+        # 计数版的 heappush / heappop
+        def push(heap, item):
+            heappush(heap, item)
+            self.pushes += 1
+            if len(heap) > self.max_frontier:
+                self.max_frontier = len(heap)
 
+        def pop(heap):
+            self.pops += 1
+            return heappop(heap)
 
-sqrt_2 = sqrt(2)
+        return push, pop
 
-links = [
-    Point(0, -1), Point(0, 1), Point(-1, 0), Point(1, 0),
-    Point(-1, -1), Point(1, -1), Point(-1, 1), Point(1, 1),
-]
+    def attach(self, search):
+        self.searches.append(search)
+        return self.counters()
 
+    def begin(self):
+        if self.memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self.tracing = True
+            self.peak_memory = tracemalloc.get_traced_memory()[0]
+        self.mark = time.perf_counter()
 
-# 对角距离
-def heuristic(p, q):
-    dx = abs(p.x - q.x)
-    dy = abs(p.y - q.y)
-    return (dx + dy) + (sqrt_2 - 2) * min(dx, dy)
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.timers[phase] += now - self.mark
+        self.mark = now
+
+    def end(self):
+        for search in self.searches:
+            expanded, labeled, stale = search.counts()
+            self.expanded += expanded
+            self.labeled += labeled
+            self.stale += stale
+        self.searches = []
+
+        if self.labeled:
+            # 每个被标记的结点首次入堆一次，其余入堆都是对 open 中结点的更新
+            self.repushed = self.pushes - self.labeled
+        if self.memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1] - self.peak_memory
+            if self.tracing:
+                tracemalloc.stop()
+                self.tracing = False
+
+
+class AStar(object):
+    """
+    单线程 A* 搜索核心。g / closed / parent 都是以 y * long + x 为下标的数组，
+    堆中只存 (f, h, index)，过期条目在弹出时跳过（惰性删除）。
+
+    reverse=True 时从 target 反向搜索到 start，g 为到终点的代价（不含当前格的地形代价）。
+    table 为按下标给出的启发值表（如 Landmarks.heuristic），默认使用对角距离。
+    stats 为 SearchStats 时使用计数版的堆操作。
+    """
+
+    def __init__(self, start: Point, target: Point, costs, long, high, reverse=False, table=None, stats=None):
+        self.costs = costs
+        self.long = long
+        self.high = high
+        self.target = target = Point(int(target.x), int(target.y))
+        self.reverse = reverse
+        self.table = table
+        self.heappush, self.heappop = (heappush, heappop) if stats is None else stats.attach(self)
+
+        self.g, self.parent, self.closed = self.storage(long * high)
+        self.open = []
+        self.stale = 0
+
+        index = int(start.y) * long + int(start.x)
+        h = heuristic(start, target) if table is None else table[index]
+        self.g[index] = 0
+        self.heappush(self.open, (h, h, index))
+
+    def storage(self, size):
+        # g / parent / closed，每格 8 + 4 + 1 字节
+        return array('d', [inf]) * size, array('i', [-1]) * size, bytearray(size)
+
+    def counts(self):
+        # (已扩展结点数, 已标记结点数, 跳过的过期条目数)，供 SearchStats 统计
+        return self.closed.count(1), int(np.count_nonzero(np.frombuffer(self.g) < inf)), self.stale
+
+    def step(self):
+        # 扩展一个结点并返回其下标，open 为空时返回 -1
+        open_set, closed, heappop = self.open, self.closed, self.heappop
+        while open_set:
+            current = heappop(open_set)[2]
+            if not closed[current]:
+                break
+            self.stale += 1
+        else:
+            return -1
+        closed[current] = 1
+
+        g, parent, costs, long, high = self.g, self.parent, self.costs, self.long, self.high
+        heappush = self.heappush
+        tx, ty = self.target
+        y, x = divmod(current, long)
+        current_g = g[current]
+        current_cost = costs[current] if self.reverse else None
+        table = self.table
+        for idx, (lx, ly) in enumerate(links):
+            nx = x + lx
+            ny = y + ly
+            if nx < 0 or nx >= long or ny < 0 or ny >= high:
+                continue
+            point = ny * long + nx
+            if closed[point] or costs[point] < 0:
+                continue
+
+            # 正向进入 point 付出 point 的地形代价，反向则是 current 的
+            cost = current_g + (costs[point] if current_cost is None else current_cost) + (1 if idx < 4 else sqrt_2)
+            if cost < g[point]:
+                g[point] = cost
+                parent[point] = current
+                if table is None:
+                    dx = abs(nx - tx)
+                    dy = abs(ny - ty)
+                    h = (dx + dy) + (sqrt_2 - 2) * (dx if dx < dy else dy)
+                else:
+                    h = table[point]
+                heappush(open_set, (cost + h, h, point))
+        return current
+
+    def trace(self, index):
+        # 沿 parent 回溯到起点，返回下标 [index, ..., start]
+        res = []
+        parent = self.parent
+        while index >= 0:
+            res.append(index)
+            index = parent[index]
+        return res
+
+    def path(self, index):
+        res = []
+        for point in self.trace(index):
+            y, x = divmod(point, self.long)
+            res.append(Point(x, y))
+        return res
+
+
+@exe_time
+def a_star(start: Point, end: Point, gird, long, high, landmarks=None, stats=None):
+    if stats is not None:
+        stats.begin()
+    long, high = int(long), int(high)
+    costs = flatten(gird, long, high)
+    target = int(end.y) * long + int(end.x)
+    table = None if landmarks is None else landmarks.heuristic(target)
+    search = AStar(start, end, costs, long, high, table=table, stats=stats)
+    if stats is not None:
+        stats.lap('setup')
+
+    current = search.step()
+    while current != target:
+        if current < 0:
+            break
+        current = search.step()
+    if stats is not None:
+        stats.lap('search')
 
+    res = search.path(target) if current == target else []
+    if stats is not None:
+        stats.lap('reconstruction')
+        stats.end()
+    return res, search.g[target]
 
-def a_star_step(open_set: PriorityQueue, close_set: set, res, target, gird, long, high):
-    current = open_set.get()
-    if current in close_set:
-        return
-    close_set.add(current)
-
-    if current == target:
-        while current is not None:
-            res.append(current)
-            current = current.parent
-        return
-    for idx, link in enumerate(links):
-        point = current + link
-        if point in close_set:
+
+@exe_time
+def double_a_star(start: Point, end: Point, gird, long, high, stats=None):
+    """
+    双向 A*：两侧使用平均势 p = (h_end - h_start) / 2 与 -p 作为启发（两侧同时相容），
+    各自维护以下标索引的 g，扩展后用扩展点及其邻居更新最优相遇代价 mu，
+    两侧堆顶之和不小于 mu 时即可证明 mu 最优；每轮扩展 open 较小的一侧。
+
+    平均势比各自的对角距离弱，扩展的结点数与 a_star 相当（随机地图上可能更多），
+    加上每次扩展要更新 mu，耗时通常高于 a_star；改用各自的对角距离（front-to-end）时扩展数更多。
+    """
+    if stats is not None:
+        stats.begin()
+    long, high = int(long), int(high)
+    costs = flatten(gird, long, high)
+    if costs[int(end.y) * long + int(end.x)] < 0 and (int(start.x), int(start.y)) != (int(end.x), int(end.y)):
+        # 终点不可通行，与 a_star 一致（起点即终点时 a_star 直接返回 [start], 0）
+        if stats is not None:
+            stats.end()
+        return [], inf
+
+    y, x = np.divmod(np.arange(long * high), long)
+    dx, dy = np.abs(x - int(end.x)), np.abs(y - int(end.y))
+    to_end = (dx + dy) + (sqrt_2 - 2) * np.minimum(dx, dy)
+    dx, dy = np.abs(x - int(start.x)), np.abs(y - int(start.y))
+    from_start = (dx + dy) + (sqrt_2 - 2) * np.minimum(dx, dy)
+    potential = (to_end - from_start) / 2
+
+    forward = AStar(start, end, costs, long, high, table=memoryview(potential), stats=stats)
+    backward = AStar(end, start, costs, long, high, reverse=True, table=memoryview(-potential), stats=stats)
+    if stats is not None:
+        stats.lap('setup')
+
+    mu = inf
+    middle = -1
+    while forward.open and backward.open:
+        if forward.open[0][0] + backward.open[0][0] >= mu:
+            break
+
+        search, other = (forward, backward) if len(forward.open) <= len(backward.open) else (backward, forward)
+        current = search.step()
+        if current < 0:
             continue
 
-        if point not in open_set.queue:
-            x, y = point
-            if x < 0 or x > long - 1:
+        # 正向 g 含该格地形代价、反向 g 不含，相加即整条路径的代价
+        g, other_g = search.g, other.g
+        y, x = divmod(current, long)
+        for lx, ly in links:
+            nx = x + lx
+            ny = y + ly
+            if nx < 0 or nx >= long or ny < 0 or ny >= high:
                 continue
-            if y < 0 or y > high - 1:
+            point = ny * long + nx
+            if g[point] + other_g[point] < mu:
+                mu = g[point] + other_g[point]
+                middle = point
+        if g[current] + other_g[current] < mu:
+            mu = g[current] + other_g[current]
+            middle = current
+    if stats is not None:
+        stats.lap('search')
+
+    res = []
+    if middle >= 0:
+        res = backward.path(middle)[:0:-1]
+        res.extend(forward.path(middle))
+    if stats is not None:
+        stats.lap('reconstruction')
+        stats.end()
+    return res, mu
+
+
+class JumpPointSearch(AStar):
+    """
+    8 邻接网格上的跳点搜索（允许贴角斜走，与 a_star 的移动规则一致）。
+
+    weighted=False 为经典 JPS，只在所有可通行格代价相同时保证最优；
+    weighted=True 时只在同一代价区域内跳跃：与其他代价区域相邻的格子都作为跳点并完整扩展，
+    因此在带地形代价的地图上得到与 a_star 相同的代价。
+    """
+
+    def __init__(self, start: Point, target: Point, costs, long, high, weighted=True, stats=None):
+        super(JumpPointSearch, self).__init__(start, target, costs, long, high, stats=stats)
+        self.target_index = self.target.y * long + self.target.x
+        self.boundary = bytearray(long * high)
+        if weighted:
+            grid = np.asarray(costs, dtype=np.float64).reshape(high, long)
+            padded = np.pad(grid, 1, constant_values=-1)
+            boundary = np.zeros((high, long), dtype=bool)
+            for lx, ly in links:
+                neighbor = padded[1 + ly:1 + ly + high, 1 + lx:1 + lx + long]
+                boundary |= (neighbor >= 0) & (neighbor != grid)
+            self.boundary = bytearray(boundary.tobytes())
+
+    def blocked(self, x, y):
+        return x < 0 or x >= self.long or y < 0 or y >= self.high or self.costs[y * self.long + x] < 0
+
+    def jump(self, x, y, dx, dy):
+        # 从 (x, y) 沿 (dx, dy) 跳跃，返回 (跳点下标, 累计代价)，撞墙返回 None
+        blocked, costs, long = self.blocked, self.costs, self.long
+        move = 1 if dx == 0 or dy == 0 else sqrt_2
+        cost = 0
+        while True:
+            x += dx
+            y += dy
+            if blocked(x, y):
+                return None
+            point = y * long + x
+            cost += costs[point] + move
+            if point == self.target_index or self.boundary[point]:
+                return point, cost
+
+            if dx and dy:
+                if (blocked(x - dx, y) and not blocked(x - dx, y + dy)) or \
+                        (blocked(x, y - dy) and not blocked(x + dx, y - dy)):
+                    return point, cost
+                if self.jump(x, y, dx, 0) is not None or self.jump(x, y, 0, dy) is not None:
+                    return point, cost
+            elif dx:
+                if (blocked(x, y + 1) and not blocked(x + dx, y + 1)) or \
+                        (blocked(x, y - 1) and not blocked(x + dx, y - 1)):
+                    return point, cost
+            else:
+                if (blocked(x + 1, y) and not blocked(x + 1, y + dy)) or \
+                        (blocked(x - 1, y) and not blocked(x - 1, y + dy)):
+                    return point, cost
+
+    def directions(self, current, x, y):
+        # 按父结点方向剪枝后的搜索方向
+        parent = self.parent[current]
+        if parent < 0 or self.boundary[current]:
+            return links
+
+        py, px = divmod(parent, self.long)
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        blocked = self.blocked
+        if dx and dy:
+            res = [(dx, 0), (0, dy), (dx, dy)]
+            if blocked(x - dx, y):
+                res.append((-dx, dy))
+            if blocked(x, y - dy):
+                res.append((dx, -dy))
+        elif dx:
+            res = [(dx, 0)]
+            if blocked(x, y + 1):
+                res.append((dx, 1))
+            if blocked(x, y - 1):
+                res.append((dx, -1))
+        else:
+            res = [(0, dy)]
+            if blocked(x + 1, y):
+                res.append((1, dy))
+            if blocked(x - 1, y):
+                res.append((-1, dy))
+        return res
+
+    def step(self):
+        open_set, closed, heappop = self.open, self.closed, self.heappop
+        while open_set:
+            current = heappop(open_set)[2]
+            if not closed[current]:
+                break
+            self.stale += 1
+        else:
+            return -1
+        closed[current] = 1
+
+        g, parent, heappush = self.g, self.parent, self.heappush
+        tx, ty = self.target
+        y, x = divmod(current, self.long)
+        for dx, dy in self.directions(current, x, y):
+            jumped = self.jump(x, y, dx, dy)
+            if jumped is None:
                 continue
-            if gird[y][x] < 0:
+            point, cost = jumped
+            if closed[point]:
                 continue
 
-            cost = current.g + gird[y][x] + (1 if idx < 4 else sqrt_2)
-            position = Position(x, y, cost, heuristic(point, target), current)
-            open_set.put(position)
+            cost += g[current]
+            if cost < g[point]:
+                g[point] = cost
+                parent[point] = current
+                ny, nx = divmod(point, self.long)
+                hx = abs(nx - tx)
+                hy = abs(ny - ty)
+                h = (hx + hy) + (sqrt_2 - 2) * (hx if hx < hy else hy)
+                heappush(open_set, (cost + h, h, point))
+        return current
+
+    def path(self, index):
+        # 跳点之间是直线或对角线，逐格补全
+        res = []
+        jump_points = self.trace(index)
+        for a, b in zip(jump_points, jump_points[1:]):
+            ay, ax = divmod(a, self.long)
+            by, bx = divmod(b, self.long)
+            dx = (bx > ax) - (bx < ax)
+            dy = (by > ay) - (by < ay)
+            for i in range(max(abs(bx - ax), abs(by - ay))):
+                res.append(Point(ax + i * dx, ay + i * dy))
+        y, x = divmod(jump_points[-1], self.long)
+        res.append(Point(x, y))
+        return res
 
 
 @exe_time
-def a_star(start: Point, end: Point, gird, long, high):
-    open_set = PriorityQueue()
-    close_set = set()
-    res = []
-    open_set.put(Position(start.x, start.y, 0, 0))
-    while not open_set.empty() and not len(res):
-        a_star_step(open_set, close_set, res, end, gird, long, high)
+def jps(start: Point, end: Point, gird, long, high, weighted=True, stats=None):
+    if stats is not None:
+        stats.begin()
+    long, high = int(long), int(high)
+    search = JumpPointSearch(start, end, flatten(gird, long, high), long, high, weighted, stats)
+    target = search.target_index
+    if stats is not None:
+        stats.lap('setup')
+
+    current = search.step()
+    while current != target:
+        if current < 0:
+            break
+        current = search.step()
+    if stats is not None:
+        stats.lap('search')
+
+    res = search.path(target) if current == target else []
+    if stats is not None:
+        stats.lap('reconstruction')
+        stats.end()
+    return res, search.g[target]
+
+
+def grid_search(start: Point, end: Point, costs, long, high, stats=None):
+    if stats is not None:
+        stats.begin()
+    search = AStar(start, end, costs, long, high, stats=stats)
+    target = int(end.y) * long + int(end.x)
+    if stats is not None:
+        stats.lap('setup')
+
+    current = search.step()
+    while current != target:
+        if current < 0:
+            break
+        current = search.step()
+    if stats is not None:
+        stats.lap('search')
+
+    res = np.array(search.trace(target)[::-1] if current == target else [], dtype=np.int32)
+    if stats is not None:
+        stats.lap('reconstruction')
+        stats.end()
+    return res, search.g[target]
+
+
+@exe_time
+def a_star_grid(start: Point, end: Point, grid: np.ndarray, stats=None):
+    # 直接在二维 ndarray 上搜索，返回 start -> end 的格子下标 (int32) 与代价
+    high, long = grid.shape
+    return grid_search(start, end, flatten(grid, long, high), long, high, stats)
+
+
+class SparseArray(dict):
+    # 只保存写入过的下标，其余返回 default
+    def __init__(self, default):
+        super(SparseArray, self).__init__()
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+class TiledMap(object):
+    """
+    磁盘上的分块地图，可规划远大于内存的网格。文件格式：
+
+        64 字节头：magic b'ASTILE01'、long、high、tile (int64)、dtype 字符串 (8 字节)，其余补零
+        之后按 (行块, 列块, tile, tile) 依次存放各块，边缘块不足的部分填 -1（墙）
+
+    通过 np.memmap 打开，按 y * long + x 下标取值时才把所在的块读入内存，
+    常驻的块数不超过 max_tiles，超出时按 LRU 淘汰。
+    """
+
+    magic = b'ASTILE01'
+    header = struct.Struct('<8sqqq8s')
+    offset = 64
+
+    def __init__(self, path, max_tiles=64):
+        with open(path, 'rb') as f:
+            magic, long, high, tile, dtype = self.header.unpack(f.read(self.header.size))
+        if magic != self.magic:
+            raise ValueError(f"{path} is not a tiled map")
+        self.long, self.high, self.tile = long, high, tile
+        self.shape = (-(-high // tile), -(-long // tile))
+        self.tiles = np.memmap(path, dtype=np.dtype(dtype.rstrip(b'\0').decode()), mode='r',
+                               offset=self.offset, shape=self.shape + (tile, tile))
+        self.max_tiles = max_tiles
+        self.resident = OrderedDict()
+
+    @classmethod
+    def create(cls, path, grid, tile=256):
+        # 逐块写出，grid 可以是 np.load(..., mmap_mode='r') 打开的数组
+        high, long = grid.shape
+        rows, columns = -(-high // tile), -(-long // tile)
+        with open(path, 'wb') as f:
+            f.write(cls.header.pack(cls.magic, long, high, tile, grid.dtype.str.encode()).ljust(cls.offset, b'\0'))
+            for ty in range(rows):
+                for tx in range(columns):
+                    block = np.full((tile, tile), -1, dtype=grid.dtype)
+                    part = grid[ty * tile:(ty + 1) * tile, tx * tile:(tx + 1) * tile]
+                    block[:part.shape[0], :part.shape[1]] = part
+                    f.write(block.tobytes())
+        return cls(path)
+
+    def load(self, key):
+        # 读入一个块（LRU），返回可按 iy * tile + ix 取值的 memoryview
+        resident = self.resident
+        if key in resident:
+            resident.move_to_end(key)
+            return resident[key]
+        block = memoryview(np.array(self.tiles[key]).reshape(-1))
+        resident[key] = block
+        if len(resident) > self.max_tiles:
+            resident.popitem(last=False)
+        return block
 
-    return res, res[0].g
+    def __getitem__(self, index):
+        y, x = divmod(index, self.long)
+        ty, iy = divmod(y, self.tile)
+        tx, ix = divmod(x, self.tile)
+        return self.load((ty, tx))[iy * self.tile + ix]
+
+
+class TiledAStar(AStar):
+    # g / parent / closed 只记录搜索到的格子，内存随搜索范围而不是地图大小增长
+    def storage(self, size):
+        return SparseArray(inf), SparseArray(-1), SparseArray(0)
+
+    def counts(self):
+        return sum(self.closed.values()), len(self.g), self.stale
 
 
 @exe_time
-def double_a_star(start: Point, end: Point, gird, long, high):
-    forward_open_set = PriorityQueue()
-    forward_close_set = set()
-    backward_open_set = PriorityQueue()
-    backward_close_set = set()
-
-    forward_res = []
-    forward_open_set.put(Position(start.x, start.y, 0, 0))
-
-    backward_res = []
-    backward_open_set.put(Position(end.x, end.y, gird[end.y][end.x], 0))  # 自带地形代价
-
-    middle = None
-
-    def check(forward_open_set, backward_open_set):
-        middle = None
-        item = forward_open_set.queue[0]
-        if item in backward_open_set.dict:
-            return item, backward_open_set.dict[item]
-        return middle
-
-    while (not forward_open_set.empty()) and (not backward_open_set.empty()) and (middle is None):
-        a_star_step(forward_open_set, forward_close_set, forward_res, end, gird, long, high)
-        middle = check(forward_open_set, backward_open_set)
-        if middle:
+def a_star_tiled(start: Point, end: Point, tiled: TiledMap, stats=None):
+    if stats is not None:
+        stats.begin()
+    long, high = tiled.long, tiled.high
+    search = TiledAStar(start, end, tiled, long, high, stats=stats)
+    target = int(end.y) * long + int(end.x)
+    if stats is not None:
+        stats.lap('setup')
+
+    current = search.step()
+    while current != target:
+        if current < 0:
             break
-        a_star_step(backward_open_set, backward_close_set, backward_res, start, gird, long, high)
-        middle = check(forward_open_set, backward_open_set)
+        current = search.step()
+    if stats is not None:
+        stats.lap('search')
 
-    forward, backword = middle
-    res = []
+    res = search.path(target) if current == target else []
+    if stats is not None:
+        stats.lap('reconstruction')
+        stats.end()
+    return res, search.g[target]
+
+
+class BatchResult(namedtuple('BatchResult', ['indices', 'offsets', 'costs'])):
+    # 第 i 条路径为 indices[offsets[i]:offsets[i + 1]]，不可达时为空、代价为 inf
+    def path(self, i):
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+
+_shared = None
+
+
+def _attach_grid(name, shape, dtype):
+    # 进程池初始化：挂载共享内存中的地图
+    global _shared
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(name=name)
+    _shared = memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _batch_worker(queries, grid=None):
+    # grid 为空时使用进程池初始化时挂载的共享地图
+    if grid is None:
+        grid = _shared[1]
+    high, long = grid.shape
+    costs = flatten(grid, long, high)
+    paths, lengths, res = [], [], []
+    for sx, sy, ex, ey in queries.tolist():
+        path, cost = grid_search(Point(sx, sy), Point(ex, ey), costs, long, high)
+        paths.append(path)
+        lengths.append(len(path))
+        res.append(cost)
+    return np.concatenate([np.empty(0, dtype=np.int32)] + paths), lengths, res
+
+
+@exe_time
+def batch_a_star(grid: np.ndarray, queries, workers=None):
+    """
+    同一张地图上的批量寻路。queries 形如 (Q, 2, 2) 或 (Q, 4)，每行为 start, end 的 (x, y)。
+    地图放入共享内存，查询分块交给进程池。
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    grid = np.ascontiguousarray(grid)
+    queries = np.asarray(queries, dtype=np.int64).reshape(-1, 4)
+    workers = workers or os.cpu_count()
+    chunks = np.array_split(queries, min(len(queries), workers * 4) or 1)
+
+    if workers == 1:
+        # 单进程时直接传入地图，不改动模块级的 _shared
+        results = [_batch_worker(chunk, grid) for chunk in chunks]
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=max(grid.nbytes, 1))
+        try:
+            np.ndarray(grid.shape, dtype=grid.dtype, buffer=memory.buf)[...] = grid
+            with ProcessPoolExecutor(workers, initializer=_attach_grid,
+                                     initargs=(memory.name, grid.shape, grid.dtype)) as executor:
+                results = list(executor.map(_batch_worker, chunks))
+        finally:
+            memory.close()
+            memory.unlink()
+
+    lengths = [length for _, chunk, _ in results for length in chunk]
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return BatchResult(
+        np.concatenate([paths for paths, _, _ in results]),
+        offsets,
+        np.array([cost for _, _, chunk in results for cost in chunk], dtype=np.float64)
+    )
+
+
+class HierarchicalMap(object):
+    """
+    HPA*：把地图切成 cluster x cluster 的块，在相邻块的公共边上放置入口结点，
+    块间入口以一步相连，块内入口之间的代价用局部搜索预先算好（包含地形代价与墙）。
+    查询时把起点终点接入抽象图，在抽象图上搜索后逐段在块内细化，结果接近最优。
+    """
+
+    def __init__(self, gird, long, high, cluster=10, edges=None):
+        self.long = long = int(long)
+        self.high = high = int(high)
+        self.cluster = cluster = int(cluster)
+        self.grid = np.asarray(gird).reshape(high, long)
+
+        if edges is None:
+            edges = self.build()
+        self.edges = edges
+
+        self.graph = {}
+        self.nodes = {}
+        for src, dst, cost in zip(*(np.asarray(column).tolist() for column in edges)):
+            self.graph.setdefault(src, []).append((dst, cost))
+        for node in self.graph:
+            self.nodes.setdefault(self.cluster_of(node), []).append(node)
 
-    while forward is not None:
-        res.append(forward)
-        forward = forward.parent
+    def cluster_of(self, index):
+        y, x = divmod(index, self.long)
+        return y // self.cluster, x // self.cluster
 
-    while backword is not None:
-        backword = backword.parent
-        if backword is not None:
-            res.insert(0, backword)
+    def local(self, key):
+        # 块的左上角坐标、宽高与展开后的代价
+        cy, cx = key
+        x0, y0 = cx * self.cluster, cy * self.cluster
+        sub = np.ascontiguousarray(self.grid[y0:y0 + self.cluster, x0:x0 + self.cluster])
+        high, long = sub.shape
+        return x0, y0, long, high, flatten(sub, long, high)
 
-    return res, middle[0].g + middle[1].g
+    def local_search(self, index, reverse=False, stats=None):
+        # 块内穷尽搜索，返回 (搜索对象, 块信息)；穷尽后 g 即为块内最短代价
+        key = self.cluster_of(index)
+        x0, y0, long, high, costs = self.local(key)
+        y, x = divmod(index, self.long)
+        search = AStar(Point(x - x0, y - y0), Point(x - x0, y - y0), costs, long, high, reverse, stats=stats)
+        while search.step() >= 0:
+            pass
+        return search, (x0, y0, long)
+
+    def build(self):
+        grid, cluster, long, high = self.grid, self.cluster, self.long, self.high
+        src, dst, cost = [], [], []
+        nodes = {}
+
+        def transitions(run):
+            # 短入口取中点，长入口取两端
+            if len(run) < 6:
+                return run[len(run) // 2:len(run) // 2 + 1]
+            return [run[0], run[-1]]
+
+        def passable(index):
+            return grid[divmod(index, long)] >= 0
+
+        def connect(a, b, move=1):
+            for u, v in ((a, b), (b, a)):
+                nodes.setdefault(self.cluster_of(u), set()).add(u)
+                y, x = divmod(v, long)
+                src.append(u)
+                dst.append(v)
+                cost.append(float(grid[y, x]) + move)
+
+        def scan(cells):
+            # cells 为边界两侧成对的格子；连续可通行段放入口，只能斜穿的位置单独放入口
+            run, covered = [], set()
+            for i, (a, b) in enumerate(cells + [(None, None)]):
+                if a is not None and passable(a) and passable(b):
+                    run.append(i)
+                    covered.add(i)
+                    continue
+                for i_ in transitions(run):
+                    connect(*cells[i_])
+                run = []
+            for i in range(len(cells) - 1):
+                if i in covered or i + 1 in covered:
+                    continue
+                (a, b), (a_, b_) = cells[i], cells[i + 1]
+                for u, v in ((a, b_), (a_, b)):
+                    if passable(u) and passable(v):
+                        connect(u, v, sqrt_2)
+
+        for bx in range(cluster, long, cluster):
+            for y0 in range(0, high, cluster):
+                scan([(y * long + bx - 1, y * long + bx) for y in range(y0, min(y0 + cluster, high))])
+        for by in range(cluster, high, cluster):
+            for x0 in range(0, long, cluster):
+                scan([((by - 1) * long + x, by * long + x) for x in range(x0, min(x0 + cluster, long))])
+        # 跨块角的斜向移动
+        for by in range(cluster, high, cluster):
+            for bx in range(cluster, long, cluster):
+                for u, v in (((by - 1) * long + bx - 1, by * long + bx), ((by - 1) * long + bx, by * long + bx - 1)):
+                    if passable(u) and passable(v):
+                        connect(u, v, sqrt_2)
+
+        for key, entrances in nodes.items():
+            for u in entrances:
+                search, (x0, y0, sub_long) = self.local_search(u)
+                for v in entrances:
+                    y, x = divmod(v, long)
+                    g = search.g[(y - y0) * sub_long + x - x0]
+                    if v != u and g < inf:
+                        src.append(u)
+                        dst.append(v)
+                        cost.append(g)
+
+        return (np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64),
+                np.array(cost, dtype=np.float64))
+
+    def save(self, path):
+        src, dst, cost = self.edges
+        np.savez(path, long=self.long, high=self.high, cluster=self.cluster, src=src, dst=dst, cost=cost)
+
+    @classmethod
+    def load(cls, path, gird):
+        npz = np.load(path)
+        return cls(gird, npz['long'], npz['high'], npz['cluster'], (npz['src'], npz['dst'], npz['cost']))
+
+    def refine(self, u, v, stats=None):
+        # 块内 u -> v 的格子下标，不含 u
+        x0, y0, long, high, costs = self.local(self.cluster_of(u))
+        uy, ux = divmod(u, self.long)
+        vy, vx = divmod(v, self.long)
+        search = AStar(Point(ux - x0, uy - y0), Point(vx - x0, vy - y0), costs, long, high, stats=stats)
+        target = (vy - y0) * long + vx - x0
+        current = search.step()
+        while current != target:
+            if current < 0:
+                return None
+            current = search.step()
+        return [(point.y + y0) * self.long + point.x + x0 for point in search.path(target)[-2::-1]]
+
+    def query(self, start: Point, end: Point, stats=None):
+        if stats is not None:
+            stats.begin()
+        long = self.long
+        s = int(start.y) * long + int(start.x)
+        t = int(end.y) * long + int(end.x)
+        if self.grid.flat[s] < 0 or self.grid.flat[t] < 0:
+            if stats is not None:
+                stats.end()
+            return [], inf
+
+        def local_costs(index, reverse):
+            search, (x0, y0, sub_long) = self.local_search(index, reverse, stats)
+            res = {}
+            for node in self.nodes.get(self.cluster_of(index), []):
+                y, x = divmod(node, long)
+                g = search.g[(y - y0) * sub_long + x - x0]
+                if g < inf:
+                    res[node] = g
+            return res, search, (x0, y0, sub_long)
+
+        from_start, search, (x0, y0, sub_long) = local_costs(s, False)
+        to_end, _, _ = local_costs(t, True)
+        from_start = list(from_start.items())
+        if self.cluster_of(s) == self.cluster_of(t):
+            ty, tx = divmod(t, long)
+            g = search.g[(ty - y0) * sub_long + tx - x0]
+            if g < inf:
+                from_start.append((t, g))
+
+        if stats is not None:
+            stats.lap('setup')
+
+        push, pop = (heappush, heappop) if stats is None else stats.counters()
+        tx, ty = divmod(t, long)[::-1]
+        g = {s: 0}
+        parent = {s: -1}
+        closed = set()
+        open_set = []
+        stale = 0
+        push(open_set, (0, s))
+        while open_set:
+            current = pop(open_set)[1]
+            if current in closed:
+                stale += 1
+                continue
+            closed.add(current)
+            if current == t:
+                break
+
+            edges = self.graph.get(current, [])
+            if current == s:
+                edges = edges + from_start
+            if current in to_end:
+                edges = edges + [(t, to_end[current])]
+            for point, cost in edges:
+                cost += g[current]
+                if point not in closed and cost < g.get(point, inf):
+                    g[point] = cost
+                    parent[point] = current
+                    y, x = divmod(point, long)
+                    push(open_set, (cost + heuristic(Point(x, y), Point(tx, ty)), point))
+        else:
+            t = -1
+        if stats is not None:
+            stats.expanded += len(closed)
+            stats.labeled += len(g)
+            stats.stale += stale
+            stats.lap('search')
+        if t < 0:
+            if stats is not None:
+                stats.end()
+            return [], inf
+
+        abstract = []
+        while t >= 0:
+            abstract.append(t)
+            t = parent[t]
+        abstract.reverse()
+
+        cells = [s]
+        for u, v in zip(abstract, abstract[1:]):
+            if self.cluster_of(u) == self.cluster_of(v):
+                refined = self.refine(u, v, stats)
+                if refined is None:
+                    if stats is not None:
+                        stats.end()
+                    return [], inf
+                cells.extend(refined)
+            else:
+                cells.append(v)
+
+        res = []
+        for point in reversed(cells):
+            y, x = divmod(point, long)
+            res.append(Point(x, y))
+        if stats is not None:
+            stats.lap('reconstruction')
+            stats.end()
+        return res, g[abstract[-1]]
+
+
+@exe_time
+def hpa_star(start: Point, end: Point, gird, long, high, hierarchy=None, stats=None):
+    if hierarchy is None:
+        hierarchy = HierarchicalMap(gird, long, high)
+    return hierarchy.query(start, end, stats)
+
+
+class DStarLite(object):
+    """
+    D* Lite 增量重规划：从终点反向维护 g / rhs，地图少量格子变化后只修复受影响的部分。
+    g 为格子到终点的代价，与 a_star 一样进入格子时付出其地形代价，-1 为墙。
+    """
+
+    def __init__(self, gird, long, high, start: Point, end: Point):
+        self.long = long = int(long)
+        self.high = high = int(high)
+        self.costs = array('d', flatten(gird, long, high))
+
+        size = long * high
+        self.g = array('d', [inf]) * size
+        self.rhs = array('d', [inf]) * size
+        self.queue = []
+        self.keys = {}  # 在队列中的结点 -> 当前 key，堆中 key 不一致的条目已过期
+        self.km = 0
+        self.stale = 0
+        self.heappush, self.heappop = heappush, heappop
+
+        self.start = int(start.y) * long + int(start.x)
+        self.goal = int(end.y) * long + int(end.x)
+        self.rhs[self.goal] = 0
+        self.push(self.goal)
+
+    def h(self, index):
+        # start 到 index 的对角距离
+        sy, sx = divmod(self.start, self.long)
+        y, x = divmod(index, self.long)
+        dx = abs(x - sx)
+        dy = abs(y - sy)
+        return (dx + dy) + (sqrt_2 - 2) * (dx if dx < dy else dy)
+
+    def key(self, index):
+        k = min(self.g[index], self.rhs[index])
+        return k + self.h(index) + self.km, k
+
+    def push(self, index):
+        key = self.key(index)
+        self.keys[index] = key
+        self.heappush(self.queue, (key, index))
+
+    def top(self):
+        queue, keys, heappop = self.queue, self.keys, self.heappop
+        while queue and keys.get(queue[0][1]) != queue[0][0]:
+            heappop(queue)
+            self.stale += 1
+        return queue[0] if queue else ((inf, inf), -1)
+
+    def neighbors(self, index):
+        # 相邻格子及 index <-> 该格子的移动距离
+        long, high = self.long, self.high
+        y, x = divmod(index, long)
+        for idx, (lx, ly) in enumerate(links):
+            nx = x + lx
+            ny = y + ly
+            if 0 <= nx < long and 0 <= ny < high:
+                yield ny * long + nx, (1 if idx < 4 else sqrt_2)
+
+    def successors(self, index):
+        # index -> 后继的代价，与 a_star 相同只要求进入的格子可通行
+        costs = self.costs
+        for point, move in self.neighbors(index):
+            if costs[point] >= 0:
+                yield point, costs[point] + move
+
+    def update_vertex(self, index):
+        if index != self.goal:
+            g = self.g
+            self.rhs[index] = min((cost + g[point] for point, cost in self.successors(index)), default=inf)
+        if self.g[index] != self.rhs[index]:
+            self.push(index)
+        else:
+            self.keys.pop(index, None)
+
+    def compute(self):
+        # 返回处理的结点数与被置为欠一致的结点数
+        g, rhs, keys = self.g, self.rhs, self.keys
+        start = self.start
+        expanded = underconsistent = 0
+        while True:
+            k_old, current = self.top()
+            # 浮点累加顺序不同会让相等的 key 差一个 ulp，多处理几个结点是安全的
+            k_start = self.key(start)
+            if not (k_old < (k_start[0] + 1e-9, k_start[1]) or rhs[start] != g[start]):
+                return expanded, underconsistent
+            expanded += 1
+            k_new = self.key(current)
+            if k_old < k_new:
+                self.push(current)
+            elif g[current] > rhs[current]:
+                g[current] = rhs[current]
+                del keys[current]
+                for point, _ in self.neighbors(current):
+                    self.update_vertex(point)
+            else:
+                underconsistent += 1
+                g[current] = inf
+                self.update_vertex(current)
+                for point, _ in self.neighbors(current):
+                    self.update_vertex(point)
+
+    def update_cells(self, cells):
+        # cells: [(x, y, cost), ...]，改变格子的代价（-1 为墙）
+        changed = []
+        for x, y, cost in cells:
+            index = int(y) * self.long + int(x)
+            if self.costs[index] != cost:
+                self.costs[index] = cost
+                changed.append(index)
+        for index in changed:
+            self.update_vertex(index)
+            for point, _ in self.neighbors(index):
+                self.update_vertex(point)
+
+    def move(self, start: Point):
+        # 起点移动后 key 的下界整体偏移 km
+        self.km += self.h(int(start.y) * self.long + int(start.x))
+        self.start = int(start.y) * self.long + int(start.x)
+
+    def replan(self, stats=None):
+        # 返回 [end, ..., start] 与代价，不可达时为 [] 和 inf
+        if stats is not None:
+            stats.begin()
+            self.heappush, self.heappop = stats.counters()
+            stats.lap('setup')
+        stale = self.stale
+        expanded, underconsistent = self.compute()
+        if stats is not None:
+            self.heappush, self.heappop = heappush, heappop
+            stats.expanded += expanded
+            stats.underconsistent += underconsistent
+            stats.stale += self.stale - stale
+            stats.lap('search')
+
+        g = self.g
+        current = self.start
+        res = []
+        if g[current] < inf:
+            cells = [current]
+            while current != self.goal:
+                current = min(self.successors(current), key=lambda item: item[1] + g[item[0]])[0]
+                cells.append(current)
+            for point in reversed(cells):
+                y, x = divmod(point, self.long)
+                res.append(Point(x, y))
+        if stats is not None:
+            stats.lap('reconstruction')
+            stats.end()
+        return res, g[self.start]
+
+
+@exe_time
+def flow_field(end: Point, gird, long, high):
+    """
+    一次算出所有格子到 end 的代价场与下一步方向场（links 下标，-1 为终点或不可达）。
+    代价场由从 end 出发、启发为 0 的完整反向 AStar（即反向 Dijkstra）得到；
+    方向场再按 links 的 8 个方向整体平移，取 move + enter[u] + field[u] 最小的邻居 u。
+    """
+    long, high = int(long), int(high)
+    ex, ey = int(end.x), int(end.y)
+    grid = np.asarray(gird, dtype=np.float64).reshape(high, long)
+    enter = np.where(grid >= 0, grid, inf)  # 进入格子的地形代价，墙为 inf
+    moves = [1 if idx < 4 else sqrt_2 for idx in range(len(links))]
+
+    field = np.full((high, long), inf)
+    directions = np.full((high, long), -1, dtype=np.int8)
+    if enter[ey, ex] == inf:
+        return field, directions
+
+    search = AStar(Point(ex, ey), Point(ex, ey), flatten(gird, long, high), long, high, reverse=True,
+                   table=memoryview(np.zeros(long * high)))
+    while search.step() >= 0:
+        pass
+    field = np.frombuffer(search.g).reshape(high, long).copy()
+
+    # v 走向 u = v + link 的代价为 move + enter[u] + field[u]
+    best = np.full((high, long), inf)
+    padded = np.full((high + 2, long + 2), inf)
+    padded[1:-1, 1:-1] = field + enter
+    for idx, (lx, ly) in enumerate(links):
+        candidate = padded[1 + ly:1 + ly + high, 1 + lx:1 + lx + long] + moves[idx]
+        better = candidate < best
+        np.copyto(best, candidate, where=better)
+        np.copyto(directions, idx, where=better)
+    directions[ey, ex] = -1
+
+    # 墙格不会被搜索到，但与 a_star 一样，从墙格出发只付出之后进入的格子的代价
+    walls = grid < 0
+    field[walls] = best[walls]
+    return field, directions
+
+
+def follow(start: Point, directions):
+    # 沿方向场走到终点，返回 [end, ..., start]；不可达时只有 start，其代价场为 inf
+    x, y = int(start.x), int(start.y)
+    res = [Point(x, y)]
+    idx = directions[y, x]
+    while idx >= 0:
+        x += links[idx].x
+        y += links[idx].y
+        res.append(Point(x, y))
+        idx = directions[y, x]
+    return res[::-1]
+
+
+class Landmarks(object):
+    """
+    ALT 启发：选 K 个地标，预先算出每个地标到所有格子、所有格子到地标的最短代价（float32），
+    查询时用三角不等式 d(v, t) >= d(v, L) - d(t, L) 与 d(v, t) >= d(L, t) - d(L, v) 给出下界。
+    """
+
+    def __init__(self, gird, long, high, count=8, landmarks=None, distances=None):
+        self.long = long = int(long)
+        self.high = high = int(high)
+        self.costs = flatten(gird, long, high)
+        if distances is None:
+            landmarks, distances = self.build(count)
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.distances = np.asarray(distances, dtype=np.float32)  # (K, 2, size)：[:, 0] 为 L -> v，[:, 1] 为 v -> L
+
+        finite = self.distances[np.isfinite(self.distances)]
+        # float32 舍入误差的上界，从下界中扣除以保证可采纳
+        self.slack = float(np.spacing(finite.max())) if finite.size else 0.
+        y, x = np.divmod(np.arange(long * high), long)
+        self.x, self.y = x, y
+
+    def distance_field(self, index, reverse=False):
+        # 一对多最短代价：搜索穷尽后 g 即为精确值
+        y, x = divmod(index, self.long)
+        search = AStar(Point(x, y), Point(x, y), self.costs, self.long, self.high, reverse)
+        while search.step() >= 0:
+            pass
+        return np.frombuffer(search.g, dtype=np.float64)
+
+    def build(self, count):
+        # 最远点选取：每次取离已选地标最远的可达格子
+        passable = np.flatnonzero(np.asarray(self.costs) >= 0)
+        landmarks, distances = [], []
+        nearest = self.distance_field(int(passable[0]))
+        for _ in range(min(count, len(passable))):
+            candidates = np.where(np.isfinite(nearest), nearest, -1)
+            landmark = int(np.argmax(candidates))
+            if candidates[landmark] <= 0 and landmarks:
+                break
+            forward = self.distance_field(landmark)
+            backward = self.distance_field(landmark, reverse=True)
+            landmarks.append(landmark)
+            distances.append((forward, backward))
+            nearest = forward if len(landmarks) == 1 else np.minimum(nearest, forward)
+        return landmarks, np.array(distances, dtype=np.float32)
+
+    def heuristic(self, target):
+        # 到 target 的启发值表，inf 表示不可达
+        forward, backward = self.distances[:, 0], self.distances[:, 1]
+        with np.errstate(invalid='ignore'):
+            bound = np.fmax(
+                backward - backward[:, target:target + 1],
+                forward[:, target:target + 1] - forward
+            ).astype(np.float64)
+        bound = np.fmax.reduce(bound, axis=0) - self.slack
+
+        ty, tx = divmod(target, self.long)
+        dx = np.abs(self.x - tx)
+        dy = np.abs(self.y - ty)
+        octile = (dx + dy) + (sqrt_2 - 2) * np.minimum(dx, dy)
+        return memoryview(np.fmax(bound, octile))
+
+    def save(self, path):
+        np.savez(path, long=self.long, high=self.high, landmarks=self.landmarks, distances=self.distances)
+
+    @classmethod
+    def load(cls, path, gird):
+        npz = np.load(path)
+        return cls(gird, npz['long'], npz['high'], landmarks=npz['landmarks'], distances=npz['distances'])
 
 
 def display(map, long, high, start, end, alg=a_star):
@@ -204,7 +1248,6 @@ def display(map, long, high, start, end, alg=a_star):
 
 
 def main(num=1):
-    import numpy as np
     npz = np.load(f'data/map{num}.npz')
     map = npz['map']
     long = npz['long']
@@ -214,10 +1257,10 @@ def main(num=1):
 
     display(map, long, high, start, end, a_star)
     display(map, long, high, start, end, double_a_star)
+    display(map, long, high, start, end, jps)
 
 
 def build_map2():
-    import numpy as np
     from PIL import Image
     img = Image.open("data/map2.png")
 
@@ -237,6 +1280,28 @@ def build_map2():
     np.savez('data/map2.npz', map=map, long=long, high=high, start=start, end=end)
 
 
+def build_tiles(num=1, tile=256):
+    # 转换为 data/map{num}.tiles，用 TiledMap 按需分块读取
+    npz = np.load(f'data/map{num}.npz')
+    return TiledMap.create(f'data/map{num}.tiles', npz['map'], tile)
+
+
+def build_hierarchy(num=1, cluster=10):
+    # 预处理结果保存在 data/map{num}_hpa.npz，用 HierarchicalMap.load 复用
+    npz = np.load(f'data/map{num}.npz')
+    hierarchy = HierarchicalMap(npz['map'], npz['long'], npz['high'], cluster)
+    hierarchy.save(f'data/map{num}_hpa.npz')
+    return hierarchy
+
+
+def build_landmarks(num=1, count=8):
+    # 预处理结果保存在 data/map{num}_alt.npz，用 Landmarks.load 复用
+    npz = np.load(f'data/map{num}.npz')
+    landmarks = Landmarks(npz['map'], npz['long'], npz['high'], count)
+    landmarks.save(f'data/map{num}_alt.npz')
+    return landmarks
+
+
 if __name__ == '__main__':
     main(1)
     main(2)
@@ -1,4 +1,8 @@
+import os
 import time, random
+import struct
+from heapq import heapify, heappush, heappop
+import numpy as np
 import matplotlib.pyplot as plt
 
 
@@ -13,63 +17,224 @@ def exe_time(func):
     return new_func
 
 
+def popcount(words: np.ndarray):
+    # 每个 uint64 中 1 的个数
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return np.unpackbits(words.view(np.uint8).reshape(*words.shape, 8), axis=-1).sum(axis=-1)
+
+
+class SetCoverInstance:
+    # 集合覆盖实例的稀疏关联矩阵（CSR）：元素编号为 0..size-1，第 i 个集合为 indices[indptr[i]:indptr[i + 1]]
+    # 元素个数不少于 dense * size 的集合另存一份按位压缩的 uint64 位图
+    def __init__(self, size, indptr, indices, labels=None, dense=None):
+        self.size = size
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        self.labels = labels
+        self.transposed = None
+
+        self.dense = np.empty(0, dtype=np.int64)
+        self.bits = np.empty((0, (size + 63) // 64), dtype=np.uint64)
+        if dense is not None:
+            self.dense = np.flatnonzero(np.diff(self.indptr) >= dense * size)
+            self.bits = np.zeros((len(self.dense), (size + 63) // 64), dtype=np.uint64)
+            for row, i in enumerate(self.dense):
+                items = self.indices[self.indptr[i]:self.indptr[i + 1]]
+                np.bitwise_or.at(self.bits[row], items >> 6, np.left_shift(np.uint64(1), (items & 63).astype(np.uint64)))
+
+    @classmethod
+    def from_sets(cls, X: set, F: list, dense=None):
+        labels = sorted(X)
+        ids = {e: i for i, e in enumerate(labels)}
+        indptr = np.zeros(len(F) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in F], out=indptr[1:])
+        indices = np.fromiter((ids[e] for s in F for e in s), dtype=np.int32, count=indptr[-1])
+        return cls(len(labels), indptr, indices, labels, dense)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.bits.nbytes
+
+    def members(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def to_sets(self, chosen=None):
+        # 转回元素标签组成的集合
+        chosen = range(len(self)) if chosen is None else chosen
+        labels = self.labels if self.labels is not None else range(self.size)
+        return [{labels[e] for e in self.members(i).tolist()} for i in chosen]
+
+    def transpose(self):
+        # 元素 -> 集合 的倒排索引，同样是 CSR
+        if self.transposed is None:
+            sets = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(self.size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.size), out=indptr[1:])
+            self.transposed = (indptr, sets[order])
+        return self.transposed
+
+    def frequency(self):
+        # 每个元素出现在多少个集合中
+        return np.bincount(self.indices, minlength=self.size)
+
+    def uncovered(self, covered: np.ndarray):
+        # 每个集合中尚未覆盖的元素个数，稠密集合用位图计数
+        counts = np.zeros(len(self), dtype=np.int64)
+        sizes = np.diff(self.indptr)
+        nonempty = np.flatnonzero(sizes)
+        if len(nonempty):
+            counts[nonempty] = np.add.reduceat(~covered[self.indices], self.indptr[nonempty])
+        if len(self.dense):
+            mask = np.packbits(covered, bitorder="little")
+            mask = np.pad(mask, (0, self.bits.shape[1] * 8 - len(mask))).view(np.uint64)
+            counts[self.dense] = popcount(self.bits & ~mask).sum(axis=1)
+        return counts
+
+    def covers(self, chosen):
+        covered = np.zeros(self.size, dtype=bool)
+        for i in chosen:
+            covered[self.members(i)] = True
+        return bool(covered.all())
+
+
+def ragged(indptr: np.ndarray, rows: np.ndarray):
+    # CSR 中若干行的全部位置，按行拼接
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)
+
+
+def greedy_instance(instance: SetCoverInstance):
+    # SetCoverInstance 上的惰性贪心，返回选中集合的下标，选择顺序与 greedy 相同
+    eptr, esets = instance.transpose()
+    gain = np.diff(instance.indptr)
+    covered = np.zeros(instance.size, dtype=bool)
+    heap = [(-g, i) for i, g in enumerate(gain.tolist()) if g > 0]
+    heapify(heap)
+
+    remain = instance.size
+    C = []
+    while remain and heap:
+        g, i = heappop(heap)
+        if -g != gain[i]:
+            if gain[i] > 0:
+                heappush(heap, (-int(gain[i]), i))
+            continue
+
+        items = instance.members(i)
+        items = items[~covered[items]]
+        covered[items] = True
+        remain -= len(items)
+        np.subtract.at(gain, esets[ragged(eptr, items)], 1)
+        C.append(i)
+
+    return C
+
+
 @exe_time
-def greedy(X: set, F: list):
-    price = {x: 1 for x in X}
+def greedy(X: set, F: list = None):
+    # X 为 SetCoverInstance 时返回选中集合的下标
+    if isinstance(X, SetCoverInstance):
+        return greedy_instance(X)
+
+    # 惰性贪心：堆中存 (-未覆盖元素数, 下标)，弹出时若收益已过期则更新后放回
+    # 元素 -> 集合 的倒排索引使得覆盖一个元素只需减少包含它的集合的收益
+    # 选择顺序与逐轮扫描全部集合相同（收益相同时取下标最小的集合），且不修改 F
+    index = {}
+    for i, s in enumerate(F):
+        for e in s:
+            index.setdefault(e, []).append(i)
+
+    gain = [len(s) for s in F]
+    heap = [(-g, i) for i, g in enumerate(gain) if g > 0]
+    heapify(heap)
+
     U = set()
     C = []
-    while U != X:
-        s_u = None
-        min_s = None
-        min_cost = float("inf")
-        for i, s in enumerate(F):
-            temp = s - U
-            cost = (1 / len(temp)) if len(temp) > 0 else float("inf")
-            if cost < min_cost:
-                min_s = i
-                s_u = temp
-                min_cost = cost
-
-        for e in s_u:
-            price[e] = min_cost
-
-        U.update(s_u)
-        C.append(F.pop(min_s))
+    while len(U) < len(X) and heap:
+        g, i = heappop(heap)
+        if -g != gain[i]:
+            if gain[i] > 0:
+                heappush(heap, (-gain[i], i))
+            continue
+
+        for e in F[i]:
+            if e not in U:
+                U.add(e)
+                for j in index[e]:
+                    gain[j] -= 1
+        C.append(F[i])
 
     return C
 
 
-@exe_time
-def linear(X: set, F: list):
-    from itertools import chain
-    from collections import Counter
-    from pulp import LpProblem, LpMinimize, LpVariable, lpSum, value
-    problem = LpProblem(sense=LpMinimize)
-    variables = [LpVariable(f"x{i}", 0) for i in range(len(F))]
+def constraint_matrix(instance: SetCoverInstance):
+    # 约束矩阵（元素 x 集合），就是倒排索引本身，构造时间与关联数成线性
+    from scipy.sparse import csr_matrix
+    eptr, esets = instance.transpose()
+    return csr_matrix((np.ones(len(esets)), esets, eptr), shape=(instance.size, len(instance)))
+
 
-    # 最小化函数
-    problem += lpSum(variables)
+def linear_instance(instance: SetCoverInstance, backend="pulp"):
+    # SetCoverInstance 上的线性规划舍入，返回选中集合的下标
+    # backend 为 "pulp" 时逐元素建约束交给 CBC，为 "highs" 时直接把稀疏矩阵交给 scipy 的 HiGHS
+    if backend == "highs":
+        from scipy.optimize import linprog
+        res = linprog(np.ones(len(instance)), A_ub=-constraint_matrix(instance), b_ub=-np.ones(instance.size),
+                      bounds=(0, None), method="highs")
+        if not res.success:
+            raise RuntimeError(res.message)
+        values = res.x
+    elif backend == "pulp":
+        from pulp import LpProblem, LpMinimize, LpVariable, lpSum, value
+        problem = LpProblem(sense=LpMinimize)
+        variables = [LpVariable(f"x{i}", 0) for i in range(len(instance))]
 
-    # 约束，X中的元素都至少有一个
-    for e in X:
-        problem += (lpSum([xs for idx, xs in enumerate(variables) if e in F[idx]]) >= 1)
+        # 最小化函数
+        problem += lpSum(variables)
 
-    problem.solve()
+        # 约束，X中的元素都至少有一个
+        eptr, esets = instance.transpose()
+        for e in range(instance.size):
+            problem += (lpSum([variables[i] for i in esets[eptr[e]:eptr[e + 1]].tolist()]) >= 1)
 
-    f = 1. / Counter(chain(*F)).most_common(1)[0][1]
-    return [F[index] for index, var in enumerate(variables) if value(var) >= f]
+        problem.solve()
+        values = np.array([value(var) or 0. for var in variables])
+    else:
+        raise ValueError(f"unknown backend {backend}")
+
+    # 留一点余量，避免求解器的舍入误差把恰好等于 f 的集合漏掉
+    f = 1. / instance.frequency().max()
+    return np.flatnonzero(values >= f - 1e-9).tolist()
+
+
+@exe_time
+def linear(X: set, F: list = None, backend="pulp"):
+    # X 为 SetCoverInstance 时返回选中集合的下标
+    if isinstance(X, SetCoverInstance):
+        return linear_instance(X, backend)
+    return [F[index] for index in linear_instance(SetCoverInstance.from_sets(X, F), backend)]
 
 
 def generate(size: int):
     x_set_source = set(range(size))
+    source = tuple(x_set_source)
     x_set = x_set_source
-    res = [set(random.sample(x_set, 20))]
+    res = [set(random.sample(source, 20))]
     x_set = x_set.difference(res[-1])
     while len(x_set) > 20:
         n = random.randint(1, 20)
         x = random.randint(1, n)
-        s = random.sample(x_set, n - x)
-        s.extend(random.sample(x_set, x))
+        # random.sample 不再接受 set，每轮只转换一次
+        population = tuple(x_set)
+        s = random.sample(population, n - x)
+        s.extend(random.sample(population, x))
         res.append(set(s))
         x_set = x_set.difference(res[-1])
 
@@ -77,11 +242,80 @@ def generate(size: int):
 
     for i in range(size - len(res)):
         n = random.randint(1, 20)
-        res.append(set(random.sample(x_set_source, n)))
+        res.append(set(random.sample(source, n)))
 
     return x_set_source, res
 
 
+def generate_instance(size: int, seed=None):
+    # 与 generate 同分布的 NumPy 版本，直接生成 SetCoverInstance
+    # 剩余元素保存为随机排列，从中无放回抽样就是取排列的下一段；两次抽样的重叠个数服从超几何分布
+    rng = np.random.default_rng(seed)
+    perm = rng.permutation(size).astype(np.int32)
+    lengths = [min(20, size)]
+    pos = lengths[0]
+    while size - pos > 20:
+        n = int(rng.integers(1, 21))
+        x = int(rng.integers(1, n + 1))
+        overlap = int(rng.hypergeometric(n - x, size - pos - (n - x), x)) if n - x else 0
+        lengths.append(n - overlap)
+        pos += n - overlap
+    lengths.append(size - pos)
+
+    # 其余集合从全体元素中无放回抽取，先整批有放回抽取，再重抽出现重复的行
+    count = max(size - len(lengths), 0)
+    sizes = rng.integers(1, 21, count)
+    rows = rng.integers(0, size, (count, 20), dtype=np.int32)
+    valid = np.arange(20) < sizes[:, None]
+    ordered = np.sort(np.where(valid, rows, -1 - np.arange(20, dtype=np.int32)), axis=1)
+    for i in np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1)):
+        rows[i, :sizes[i]] = rng.choice(size, sizes[i], replace=False)
+
+    indptr = np.zeros(len(lengths) + count + 1, dtype=np.int64)
+    np.cumsum(lengths + sizes.tolist(), out=indptr[1:])
+    indices = np.concatenate([perm, rows[valid]])
+    return SetCoverInstance(size, indptr, indices)
+
+
+INSTANCE_HEADER = struct.Struct("<8sqqq")
+INSTANCE_MAGIC = b"SETCOV01"
+
+
+def save_instance(instance: SetCoverInstance, path):
+    # 二进制格式：头部 (magic, 元素数, 集合数, 关联数)，随后依次为 int64 的 indptr 与 int32 的 indices
+    with open(path, "wb") as f:
+        f.write(INSTANCE_HEADER.pack(INSTANCE_MAGIC, instance.size, len(instance), len(instance.indices)))
+        f.write(instance.indptr.tobytes())
+        f.write(instance.indices.tobytes())
+
+
+def load_instance(path, mmap=True):
+    # mmap 为 True 时以只读内存映射打开，不把整个实例读入内存
+    with open(path, "rb") as f:
+        magic, size, sets, nnz = INSTANCE_HEADER.unpack(f.read(INSTANCE_HEADER.size))
+    if magic != INSTANCE_MAGIC:
+        raise ValueError(f"{path} is not a set cover instance")
+    offset = INSTANCE_HEADER.size
+    if mmap:
+        indptr = np.memmap(path, dtype=np.int64, mode="r", offset=offset, shape=(sets + 1,))
+        indices = np.memmap(path, dtype=np.int32, mode="r", offset=offset + indptr.nbytes, shape=(nnz,))
+    else:
+        indptr = np.fromfile(path, dtype=np.int64, count=sets + 1, offset=offset)
+        indices = np.fromfile(path, dtype=np.int32, count=nnz, offset=offset + indptr.nbytes)
+    return SetCoverInstance(size, indptr, indices)
+
+
+def cached_instance(size: int, seed=0, directory="data"):
+    # 按 (size, seed) 缓存生成的实例，多次运行基准测试时复用
+    path = os.path.join(directory, f"setcover_{size}_{seed}.bin")
+    if os.path.exists(path):
+        return load_instance(path)
+    instance = generate_instance(size, seed)
+    os.makedirs(directory, exist_ok=True)
+    save_instance(instance, path)
+    return instance
+
+
 def check(X, S):
     union = set()
     for s in S:
@@ -98,10 +332,10 @@ def main():
     linear_times = []
     greedy_times = []
     for size in sizes:
-        X, F = generate(size)
-        res, greedy_time = greedy(X, F)
+        instance = cached_instance(size)
+        res, greedy_time = greedy(instance)
         greedy_sizes.append(len(res))
-        res, linear_time = linear(X, F)
+        res, linear_time = linear(instance)
         linear_sizes.append(len(res))
 
         linear_times.append(linear_time)
@@ -1,10 +1,14 @@
 # 凸包算法
+import os
 import time
+from bisect import bisect_left
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 from functools import cmp_to_key
-from convex_closure_opt import Point, point_in_triangle, cmp, x_cmp, relative
+from convex_closure_opt import Point, point_in_triangle, cmp, x_cmp, relative, monotone_chain, \
+    graham_scan, divide_conquer, merge_hulls, batch_monotone_chain
 
 cmp = cmp_to_key(cmp)
 x_cmp = cmp_to_key(x_cmp)
@@ -60,6 +64,8 @@ def enum_closure(points: List[Point]):
 @exe_time
 def graham_sacn(points: List[Point]):
     # Graham扫描算法
+    if isinstance(points, np.ndarray):
+        return _graham_array(points)
     if len(points) <= 3:
         return points
 
@@ -85,6 +91,9 @@ def graham_sacn(points: List[Point]):
 
 @exe_time
 def dc(points: List[Point]):
+    if isinstance(points, np.ndarray):
+        return _dc_array(points)
+
     def dc_(points: List[Point]):
         # 基于分治的凸包求解算法
         if len(points) <= 3:
@@ -159,7 +168,231 @@ def dc(points: List[Point]):
     return dc_(points)
 
 
+def x_order(points_mat: np.ndarray):
+    # 按 (x, y) 排序的下标
+    order = np.argsort(points_mat[:, 0]).astype(np.intp)
+    xs = points_mat[order, 0]
+    if np.any(xs[1:] == xs[:-1]):
+        # x 有重复时需要再按 y 排序
+        order = np.lexsort((points_mat[:, 1], points_mat[:, 0])).astype(np.intp)
+    return order
+
+
+def convex_hull(points_mat: np.ndarray):
+    # 直接处理 (N, 2) 数组的单调链算法，返回逆时针的凸包顶点下标（从 x 最小的点开始）
+    points_mat = np.ascontiguousarray(points_mat, dtype=np.float64)
+    order = x_order(points_mat)
+    hull = np.empty(2 * len(order) + 1, dtype=np.intp)
+    return hull[:monotone_chain(points_mat, order, hull)].copy()
+
+
+def _graham_array(points_mat: np.ndarray):
+    # 数组版 Graham 扫描，返回逆时针的凸包顶点下标（从 y 最小的点开始）
+    points_mat = np.ascontiguousarray(points_mat, dtype=np.float64)
+    if len(points_mat) == 0:
+        return np.empty(0, dtype=np.intp)
+    lowest = np.flatnonzero(points_mat[:, 1] == points_mat[:, 1].min())
+    lowest = lowest[np.argmin(points_mat[lowest, 0])]
+    delta = points_mat - points_mat[lowest]
+    angle = np.arctan2(delta[:, 1], delta[:, 0])
+    angle[lowest] = -1.0
+    order = np.argsort(angle).astype(np.intp)
+    angles = angle[order]
+    if np.any(angles[1:] == angles[:-1]):
+        # 极角相同时近的点在前
+        order = np.lexsort((np.einsum('ij,ij->i', delta, delta), angle)).astype(np.intp)
+    stack = np.empty(len(order), dtype=np.intp)
+    return stack[:graham_scan(points_mat, order, stack)].copy()
+
+
+def _dc_array(points_mat: np.ndarray):
+    # 数组版分治算法，返回逆时针的凸包顶点下标（从 x 最小的点开始）
+    points_mat = np.ascontiguousarray(points_mat, dtype=np.float64)
+    order = x_order(points_mat)
+    hull = np.empty(2 * len(order) + 1, dtype=np.intp)
+    return hull[:divide_conquer(points_mat, order, hull)].copy()
+
+
+def _slab_hull(points_mat: np.ndarray, index: np.ndarray):
+    # 求一个竖条内点的凸包，index 为该竖条的全局下标，返回全局下标
+    hull = np.empty(2 * len(index) + 1, dtype=np.intp)
+    hull = hull[:divide_conquer(points_mat, index[x_order(points_mat[index])], hull)]
+    return hull.copy()
+
+
+@exe_time
+def parallel_dc(points_mat: np.ndarray, workers=None):
+    # 并行分治：按 x 分位数把点划分成若干竖条，各线程（Cython 内核不持有 GIL）分别求凸包，再两两用公切线合并
+    points_mat = np.ascontiguousarray(points_mat, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    if len(points_mat) < 2 * workers or workers == 1:
+        return _dc_array(points_mat)
+
+    xs = points_mat[:, 0]
+    kth = [len(xs) * i // workers for i in range(1, workers)]
+    # 一次 argpartition 得到各分位点，之后每块只处理自己那一段下标
+    part = np.argpartition(xs, kth).astype(np.intp)
+    cuts, starts = [0], [0] + kth
+    for i, k in enumerate(kth):
+        pivot = xs[part[k]]
+        if i > 0 and pivot == xs[part[kth[i - 1]]]:
+            # 与上一分位点 x 相同，整段都等于 pivot，合并到同一块
+            cuts.append(cuts[-1])
+            continue
+        # 上一段的 x 落在 [上一分位点, pivot] 内，把等于 pivot 的点挪到段尾，保证同一 x 只落在一块里
+        seg = part[starts[i]:k]
+        less = xs[seg] < pivot
+        part[starts[i]:k] = np.concatenate((seg[less], seg[~less]))
+        cuts.append(starts[i] + int(np.count_nonzero(less)))
+    cuts.append(len(xs))
+    slabs = [part[lo:hi] for lo, hi in zip(cuts[:-1], cuts[1:]) if hi > lo]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hulls = list(pool.map(lambda index: _slab_hull(points_mat, index), slabs))
+
+    while len(hulls) > 1:
+        merged = []
+        for left, right in zip(hulls[::2], hulls[1::2]):
+            hull = np.empty(2 * (len(left) + len(right)) + 1, dtype=np.intp)
+            merged.append(hull[:merge_hulls(points_mat, left, right, hull)].copy())
+        if len(hulls) % 2:
+            merged.append(hulls[-1])
+        hulls = merged
+    return hulls[0]
+
+
+@exe_time
+def batch_hull(coords: np.ndarray, offsets: np.ndarray, threads=None):
+    # 批量求大量小点集的凸包：第 g 组为 coords[offsets[g]:offsets[g + 1]]
+    # 返回同样的 CSR 布局 (indices, hull_offsets)，indices 为 coords 中的下标，每组逆时针从最左点开始
+    coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+    offsets = np.ascontiguousarray(offsets, dtype=np.intp)
+    if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(coords) \
+            or (np.diff(offsets) < 0).any():
+        raise ValueError("offsets must be a non-decreasing 1-D array from 0 to len(coords)")
+    groups = len(offsets) - 1
+    hull = np.empty(len(coords), dtype=np.intp)
+    counts = np.zeros(groups, dtype=np.intp)
+
+    threads = threads or 1
+    bounds = [groups * i // threads for i in range(threads + 1)]
+    if threads == 1:
+        batch_monotone_chain(coords, offsets, hull, counts, 0, groups)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda i: batch_monotone_chain(coords, offsets, hull, counts, bounds[i], bounds[i + 1]),
+                          range(threads)))
+
+    # 压缩成紧凑的 CSR
+    sizes = np.diff(offsets)
+    keep = np.arange(len(coords)) - np.repeat(offsets[:-1], sizes) < np.repeat(counts, sizes)
+    hull_offsets = np.zeros(groups + 1, dtype=np.intp)
+    np.cumsum(counts, out=hull_offsets[1:])
+    return hull[keep], hull_offsets
+
+
+@exe_time
+def akl_toussaint(points_mat: np.ndarray, directions=8):
+    # Akl–Toussaint 预处理：取 4/8 个方向上的极点围成凸多边形，剔除严格在其内部的点，返回保留点的下标
+    points_mat = np.asarray(points_mat, dtype=np.float64)
+    xs, ys = points_mat[:, 0], points_mat[:, 1]
+    if len(points_mat) < 4:
+        return np.arange(len(points_mat))
+    if directions == 8:
+        # 按逆时针顺序：+x, +x+y, +y, -x+y, -x, -x-y, -y, +x-y
+        extreme = [np.argmax(xs), np.argmax(xs + ys), np.argmax(ys), np.argmax(ys - xs),
+                   np.argmin(xs), np.argmin(xs + ys), np.argmin(ys), np.argmax(xs - ys)]
+    elif directions == 4:
+        extreme = [np.argmax(xs), np.argmax(ys), np.argmin(xs), np.argmin(ys)]
+    else:
+        raise ValueError("directions must be 4 or 8")
+
+    polygon = []
+    for index in extreme:
+        if not polygon or (points_mat[index] != points_mat[polygon[-1]]).any():
+            polygon.append(index)
+    if len(polygon) > 1 and (points_mat[polygon[0]] == points_mat[polygon[-1]]).all():
+        polygon.pop()
+    if len(polygon) < 3:
+        return np.arange(len(points_mat))
+
+    inside = np.ones(len(points_mat), dtype=bool)
+    for a, b in zip(polygon, polygon[1:] + polygon[:1]):
+        (ax, ay), (bx, by) = points_mat[a], points_mat[b]
+        # 严格位于每条边左侧的点在多边形内部
+        inside &= (bx - ax) * (ys - ay) - (by - ay) * (xs - ax) > 0
+    return np.flatnonzero(~inside)
+
+
+class IncrementalHull:
+    # 在线凸包：分别维护按 (x, y) 有序的下凸链和上凸链，插入时二分定位，只在插入点附近删除不再是顶点的点
+    # 上凸链以关于原点对称后的点存储，这样两条链都可以按下凸链处理（relative 对中心对称不变）
+    def __init__(self, points=()):
+        self.lower, self.lower_keys = [], []
+        self.upper, self.upper_keys = [], []
+        self.hull = []
+        self.dirty = False
+        for point in points:
+            self.insert(point)
+
+    def __len__(self):
+        return len(self.snapshot())
+
+    @staticmethod
+    def _insert(chain, keys, point):
+        key = (point.x, point.y)
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return False
+        # 落在链上或链的上方，不会成为下凸链的顶点
+        if 0 < i < len(keys) and relative(chain[i - 1], chain[i], point) >= 0:
+            return False
+        chain.insert(i, point)
+        keys.insert(i, key)
+        while i + 2 < len(chain) and relative(point, chain[i + 1], chain[i + 2]) <= 0:
+            del chain[i + 1], keys[i + 1]
+        while i >= 2 and relative(chain[i - 2], chain[i - 1], point) <= 0:
+            del chain[i - 1], keys[i - 1]
+            i -= 1
+        return True
+
+    def insert(self, point: Point):
+        # 返回凸包是否改变，内部点在两条链上各经一次二分即被拒绝
+        changed = self._insert(self.lower, self.lower_keys, point)
+        changed = self._insert(self.upper, self.upper_keys, -point) or changed
+        self.dirty = self.dirty or changed
+        return changed
+
+    def snapshot(self) -> List[Point]:
+        # 从最左点开始的逆时针凸包，两次插入之间重复调用不会重新计算
+        if self.dirty:
+            self.hull = self.lower + [-point for point in self.upper[1:-1]]
+            self.dirty = False
+        return self.hull
+
+
+def filter_points_array(points_mat: np.ndarray):
+    # filter_points 的向量化版本：排序一次，每个 x 只保留 y 最小和最大的点（去掉完全重复的点），返回连续的 (M, 2) 数组
+    points_mat = np.asarray(points_mat, dtype=np.float64).reshape(-1, 2)
+    if len(points_mat) == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    points_mat = points_mat[np.lexsort((points_mat[:, 1], points_mat[:, 0]))]
+    xs, ys = points_mat[:, 0], points_mat[:, 1]
+    first = np.empty(len(xs), dtype=bool)
+    first[0] = True
+    np.not_equal(xs[1:], xs[:-1], out=first[1:])
+    last = np.empty(len(xs), dtype=bool)
+    last[-1] = True
+    np.not_equal(xs[:-1], xs[1:], out=last[:-1])
+    # 组内最大 y 与最小 y 不同时才保留最后一个点
+    low = ys[np.flatnonzero(first)][np.cumsum(first) - 1]
+    keep = first | (last & (ys != low))
+    return np.ascontiguousarray(points_mat[keep])
+
+
 def filter_points(points):
+    if isinstance(points, np.ndarray):
+        return filter_points_array(points)
     points = sorted(points, key=x_cmp)
     filter_points = [points.pop(0)]
     last_equal = None
@@ -208,6 +441,7 @@ def main():
     enum_ts = []
     dc_ts = []
     graham_ts = []
+    akl_ts = []
 
     for size in sizes:
         points_mat = 100 * np.random.rand(size, 2)
@@ -218,9 +452,16 @@ def main():
         dc_res, dc_t = dc(points)
         graham_res, graham_t = graham_sacn(points)
 
+        # 先剔除内部点再求凸包
+        keep, akl_t = akl_toussaint(points_mat)
+        print("akl_toussaint eliminated %.2f%% of %d points" % (100 * (1 - len(keep) / size), size))
+        survivors = filter_points([Point(x=x, y=y) for x, y in points_mat[keep].tolist()])
+        akl_res, graham_t_akl = graham_sacn(survivors)
+
         enum_ts.append(enum_t)
         dc_ts.append(dc_t)
         graham_ts.append(graham_t)
+        akl_ts.append(akl_t + graham_t_akl)
 
     plt.title("convex_closure")
     plt.plot(sizes, enum_ts, color='r', label='enum')
@@ -231,6 +472,7 @@ def main():
     plt.title("convex_closure")
     plt.plot(sizes, dc_ts, color='g', label='dc')
     plt.plot(sizes, graham_ts, color='b', label='graham')
+    plt.plot(sizes, akl_ts, color='m', label='akl+graham')
     plt.legend()
     plt.savefig("convex_closure")
     plt.show()
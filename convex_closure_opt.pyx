@@ -1,13 +1,36 @@
-cdef extern from "math.h":
+cimport cython
+import numpy as np
+from libc.stdlib cimport malloc, free
+from libc.string cimport memmove
+
+cdef extern from "math.h" nogil:
     double sqrt(double theta)
     double atan2(double y, double x)
 
+@cython.freelist(256)
 cdef class Point:
-    cdef public double x, y, angle
+    # 角度在第一次访问时计算并缓存，运算产生的新点不再调用 __init__
+    cdef readonly double x, y
+    cdef double angle_
+    cdef bint has_angle
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.angle = atan2(self.y, self.x)
+
+    @staticmethod
+    cdef inline Point new(double x, double y):
+        cdef Point point = Point.__new__(Point)
+        point.x = x
+        point.y = y
+        return point
+
+    @property
+    def angle(self) -> double:
+        if not self.has_angle:
+            self.angle_ = atan2(self.y, self.x)
+            self.has_angle = True
+        return self.angle_
 
     def __repr__(self)-> str:
         return f"({self.x},{self.y})"
@@ -21,11 +44,11 @@ cdef class Point:
 
     def __add__(self, other: Point) -> Point:
         # cdef Point other
-        return Point(self.x + other.x, self.y + other.y)
+        return Point.new(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other: Point)-> Point:
         # cdef Point other
-        return Point(self.x - other.x, self.y - other.y)
+        return Point.new(self.x - other.x, self.y - other.y)
 
     def __mul__(self, other: Point) -> double:
         # 点乘
@@ -36,11 +59,121 @@ cdef class Point:
         return self.x * other.y - other.x * self.y
 
     def __neg__(self) -> Point:
-        return Point(-self.x, -self.y)
+        return Point.new(-self.x, -self.y)
 
     def __pos__(self) -> Point:
         return self
 
+    def __reduce__(self):
+        return Point, (self.x, self.y)
+
+cdef class PointArray:
+    # (N, 2) 连续 double 坐标的点集，支持缓冲区协议，与 NumPy 之间零拷贝转换
+    cdef readonly object base
+    cdef double[:, ::1] data
+    cdef Py_ssize_t shape[2]
+    cdef Py_ssize_t strides[2]
+
+    def __init__(self, data):
+        self.base = np.ascontiguousarray(data, dtype=np.float64)
+        if self.base.ndim != 2 or self.base.shape[1] != 2:
+            raise ValueError(f"expected an (N, 2) array, got shape {self.base.shape}")
+        self.data = self.base
+        self.shape[0] = self.data.shape[0]
+        self.shape[1] = 2
+        self.strides[0] = 2 * sizeof(double)
+        self.strides[1] = sizeof(double)
+
+    @staticmethod
+    def from_points(points) -> PointArray:
+        cdef Point point
+        cdef Py_ssize_t i = 0
+        cdef PointArray array = PointArray(np.empty((len(points), 2)))
+        for point in points:
+            array.data[i, 0] = point.x
+            array.data[i, 1] = point.y
+            i += 1
+        return array
+
+    def to_points(self):
+        return [Point.new(self.data[i, 0], self.data[i, 1]) for i in range(self.shape[0])]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, Py_ssize_t i) -> Point:
+        if i < 0:
+            i += self.shape[0]
+        if not 0 <= i < self.shape[0]:
+            raise IndexError("PointArray index out of range")
+        return Point.new(self.data[i, 0], self.data[i, 1])
+
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        buffer.buf = <char *> &self.data[0, 0] if self.shape[0] else NULL
+        buffer.format = 'd'
+        buffer.internal = NULL
+        buffer.itemsize = sizeof(double)
+        buffer.len = self.shape[0] * 2 * sizeof(double)
+        buffer.ndim = 2
+        buffer.obj = self
+        buffer.readonly = 0
+        buffer.shape = self.shape
+        buffer.strides = self.strides
+        buffer.suboffsets = NULL
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        pass
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def angle(self):
+        # 每个点的极角
+        cdef Py_ssize_t i
+        out = np.empty(self.shape[0])
+        cdef double[::1] res = out
+        with nogil:
+            for i in range(self.shape[0]):
+                res[i] = atan2(self.data[i, 1], self.data[i, 0])
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def cross(self, other):
+        # 逐点叉乘，other 可以是等长的 PointArray 或单个 Point
+        cdef Py_ssize_t i, n = self.shape[0]
+        cdef double[:, ::1] rhs
+        cdef double ox, oy
+        out = np.empty(n)
+        cdef double[::1] res = out
+        if isinstance(other, Point):
+            ox, oy = other.x, other.y
+            with nogil:
+                for i in range(n):
+                    res[i] = self.data[i, 0] * oy - ox * self.data[i, 1]
+            return out
+        if not isinstance(other, PointArray):
+            raise TypeError(f"expected PointArray or Point, got {type(other).__name__}")
+        rhs = (<PointArray> other).data
+        if rhs.shape[0] != n:
+            raise ValueError("PointArray lengths differ")
+        with nogil:
+            for i in range(n):
+                res[i] = self.data[i, 0] * rhs[i, 1] - rhs[i, 0] * self.data[i, 1]
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def relative(self, a: Point, b: Point):
+        # 对每个点 c 求 relative(a, b, c)，> 0 表示 c 在 a --> b 的左侧
+        cdef Py_ssize_t i
+        cdef double ax = a.x, ay = a.y, bx = b.x, by = b.y
+        out = np.empty(self.shape[0])
+        cdef double[::1] res = out
+        with nogil:
+            for i in range(self.shape[0]):
+                res[i] = (ax - self.data[i, 0]) * (by - self.data[i, 1]) - (ay - self.data[i, 1]) * (bx - self.data[i, 0])
+        return out
+
 cpdef bint point_in_triangle(a: Point, b: Point, c: Point, p: Point):
     cdef Point v0, v1, v2
     cdef double dot00, dot01, dot02, dot11, dot12
@@ -94,3 +227,276 @@ cpdef double x_cmp(a: Point, b: Point):
         return a.y - b.y
     else:
         return 1.0
+
+cdef inline double cross(const double *points, Py_ssize_t a, Py_ssize_t b, Py_ssize_t c) noexcept nogil:
+    # (b - a) x (c - a)，c 在 a -> b 左侧时为正；points 为按行展开的 (N, 2) 坐标
+    return (points[2 * b] - points[2 * a]) * (points[2 * c + 1] - points[2 * a + 1]) - \
+           (points[2 * b + 1] - points[2 * a + 1]) * (points[2 * c] - points[2 * a])
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int check_buffers(const double[:, ::1] points, const Py_ssize_t[::1] index, Py_ssize_t size,
+                       Py_ssize_t need) except -1:
+    # 内核不做边界检查，先确认坐标为 (N, 2)、下标都在范围内、输出缓冲区足够长
+    cdef Py_ssize_t i, rows = points.shape[0]
+    cdef bint valid = True
+    if points.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array")
+    if size < need:
+        raise ValueError(f"output buffer needs at least {need} entries, got {size}")
+    with nogil:
+        for i in range(index.shape[0]):
+            if index[i] < 0 or index[i] >= rows:
+                valid = False
+                break
+    if not valid:
+        raise ValueError("point index out of range")
+    return 0
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef Py_ssize_t monotone_chain(const double[:, ::1] points, const Py_ssize_t[::1] order, Py_ssize_t[::1] hull):
+    # order 为按 (x, y) 排好序的下标，hull 至少 2n + 1 长；逆时针写入凸包下标并返回顶点数
+    cdef Py_ssize_t n = order.shape[0], k = 0, lower, i, p
+    check_buffers(points, order, hull.shape[0], 2 * n + 1)
+    if n < 2:
+        hull[:n] = order
+        return n
+    cdef const double *pts = &points[0, 0]
+    with nogil:
+        for i in range(n):
+            p = order[i]
+            while k >= 2 and cross(pts, hull[k - 2], hull[k - 1], p) <= 0:
+                k -= 1
+            hull[k] = p
+            k += 1
+        lower = k + 1
+        for i in range(n - 2, -1, -1):
+            p = order[i]
+            while k >= lower and cross(pts, hull[k - 2], hull[k - 1], p) <= 0:
+                k -= 1
+            hull[k] = p
+            k += 1
+    # 最后一个点与起点相同
+    return k - 1
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef Py_ssize_t graham_scan(const double[:, ::1] points, const Py_ssize_t[::1] order, Py_ssize_t[::1] stack):
+    # order[0] 为最低点，其余按极角（同角度按距离）排好序；stack 至少 n 长，逆时针写入凸包下标并返回顶点数
+    cdef Py_ssize_t n = order.shape[0], k = 0, i, p
+    check_buffers(points, order, stack.shape[0], n)
+    if n < 3:
+        stack[:n] = order
+        return n
+    cdef const double *pts = &points[0, 0]
+    with nogil:
+        for i in range(n):
+            p = order[i]
+            while k >= 2 and cross(pts, stack[k - 2], stack[k - 1], p) <= 0:
+                k -= 1
+            stack[k] = p
+            k += 1
+    return k
+
+cdef Py_ssize_t chain(const double *points, const Py_ssize_t *order, Py_ssize_t n, Py_ssize_t *out,
+                      double sign) noexcept nogil:
+    # 单调链的一半：sign = 1 为下凸链，sign = -1 为上凸链
+    cdef Py_ssize_t k = 0, i
+    for i in range(n):
+        while k >= 2 and sign * cross(points, out[k - 2], out[k - 1], order[i]) <= 0:
+            k -= 1
+        out[k] = order[i]
+        k += 1
+    return k
+
+cdef Py_ssize_t bridge(const double *points, Py_ssize_t *left, Py_ssize_t nl, const Py_ssize_t *right, Py_ssize_t nr,
+                       double sign) noexcept nogil:
+    # 求左右两条凸链的公切线并就地合并到 left，返回合并后的长度
+    cdef Py_ssize_t i = nl - 1, j = 0
+    cdef bint moved = True
+    while moved:
+        moved = False
+        while i > 0 and sign * cross(points, left[i - 1], left[i], right[j]) <= 0:
+            i -= 1
+            moved = True
+        while j < nr - 1 and sign * cross(points, left[i], right[j], right[j + 1]) <= 0:
+            j += 1
+            moved = True
+    memmove(left + i + 1, right + j, (nr - j) * sizeof(Py_ssize_t))
+    return i + 1 + nr - j
+
+cdef void dc_chains(const double *points, const Py_ssize_t *order, Py_ssize_t lo, Py_ssize_t hi,
+                    Py_ssize_t *lower, Py_ssize_t *upper, Py_ssize_t *nl, Py_ssize_t *nu) noexcept nogil:
+    # order[lo:hi] 的下、上凸链分别写入 lower[lo:]、upper[lo:]
+    cdef Py_ssize_t mid, ll, lu, rl, ru
+    if hi - lo <= 3:
+        nl[0] = chain(points, order + lo, hi - lo, lower + lo, 1)
+        nu[0] = chain(points, order + lo, hi - lo, upper + lo, -1)
+        return
+    mid = (lo + hi) // 2
+    dc_chains(points, order, lo, mid, lower, upper, &ll, &lu)
+    dc_chains(points, order, mid, hi, lower, upper, &rl, &ru)
+    nl[0] = bridge(points, lower + lo, ll, lower + mid, rl, 1)
+    nu[0] = bridge(points, upper + lo, lu, upper + mid, ru, -1)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef Py_ssize_t divide_conquer(const double[:, ::1] points, const Py_ssize_t[::1] order, Py_ssize_t[::1] hull):
+    # order 为按 (x, y) 排好序的下标，分治求上下凸链后拼接；hull 至少 2n + 1 长，逆时针写入凸包下标并返回顶点数
+    cdef Py_ssize_t n = order.shape[0], nl, nu, i, k
+    check_buffers(points, order, hull.shape[0], 2 * n + 1)
+    if n < 2:
+        hull[:n] = order
+        return n
+    cdef Py_ssize_t *lower = <Py_ssize_t *> malloc(2 * n * sizeof(Py_ssize_t))
+    if lower == NULL:
+        raise MemoryError()
+    cdef Py_ssize_t *upper = lower + n
+    cdef const double *pts = &points[0, 0]
+    with nogil:
+        dc_chains(pts, &order[0], 0, n, lower, upper, &nl, &nu)
+        for k in range(nl):
+            hull[k] = lower[k]
+        k = nl
+        for i in range(nu - 2, 0, -1):
+            hull[k] = upper[i]
+            k += 1
+    free(lower)
+    return k
+
+cdef inline bint lex_less(const double *points, Py_ssize_t a, Py_ssize_t b) noexcept nogil:
+    return points[2 * a] < points[2 * b] or (points[2 * a] == points[2 * b] and points[2 * a + 1] < points[2 * b + 1])
+
+cdef Py_ssize_t split_chains(const double *points, const Py_ssize_t[::1] hull, Py_ssize_t *lower, Py_ssize_t *nl,
+                             Py_ssize_t *upper) noexcept nogil:
+    # 把从最左点开始的逆时针凸包拆成从左到右的下凸链与上凸链，返回上凸链长度
+    cdef Py_ssize_t h = hull.shape[0], r = 0, i, k
+    for i in range(1, h):
+        if lex_less(points, hull[r], hull[i]):
+            r = i
+    for i in range(r + 1):
+        lower[i] = hull[i]
+    nl[0] = r + 1
+    upper[0] = hull[0]
+    k = 1
+    for i in range(h - 1, r - 1, -1):
+        if i > 0:
+            upper[k] = hull[i]
+            k += 1
+    return k
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef Py_ssize_t merge_hulls(const double[:, ::1] points, const Py_ssize_t[::1] left, const Py_ssize_t[::1] right,
+                             Py_ssize_t[::1] hull):
+    # 合并两个按 (x, y) 可分的凸包（left 整体在 right 之前），输入输出均为从最左点开始的逆时针顶点下标
+    # hull 至少 2 * (len(left) + len(right)) + 1 长，返回顶点数
+    cdef Py_ssize_t hl = left.shape[0], hr = right.shape[0], nl, nu, ml, mu, i, k
+    check_buffers(points, left, hull.shape[0], 2 * (hl + hr) + 1)
+    check_buffers(points, right, hull.shape[0], 2 * (hl + hr) + 1)
+    if hl == 0 or hr == 0:
+        for i in range(hl):
+            hull[i] = left[i]
+        for i in range(hr):
+            hull[hl + i] = right[i]
+        return hl + hr
+    cdef Py_ssize_t *lower = <Py_ssize_t *> malloc(2 * (hl + hr + 2) * sizeof(Py_ssize_t))
+    if lower == NULL:
+        raise MemoryError()
+    cdef Py_ssize_t *upper = lower + hl + hr + 2
+    cdef const double *pts = &points[0, 0]
+    with nogil:
+        # 左右两边的链在缓冲区中相邻存放，再用分治中的 bridge 求公切线
+        nu = split_chains(pts, left, lower, &nl, upper)
+        mu = split_chains(pts, right, lower + nl, &ml, upper + nu)
+        nl = bridge(pts, lower, nl, lower + nl, ml, 1)
+        nu = bridge(pts, upper, nu, upper + nu, mu, -1)
+        for k in range(nl):
+            hull[k] = lower[k]
+        k = nl
+        for i in range(nu - 2, 0, -1):
+            hull[k] = upper[i]
+            k += 1
+    free(lower)
+    return k
+
+cdef void sift_down(const double *points, Py_ssize_t *order, Py_ssize_t root, Py_ssize_t n) noexcept nogil:
+    cdef Py_ssize_t child, tmp
+    while 2 * root + 1 < n:
+        child = 2 * root + 1
+        if child + 1 < n and lex_less(points, order[child], order[child + 1]):
+            child += 1
+        if not lex_less(points, order[root], order[child]):
+            return
+        tmp = order[root]
+        order[root] = order[child]
+        order[child] = tmp
+        root = child
+
+cdef void lex_sort(const double *points, Py_ssize_t *order, Py_ssize_t n) noexcept nogil:
+    # 按 (x, y) 对下标排序：小组用插入排序，大组用堆排序
+    cdef Py_ssize_t i, j, tmp
+    if n <= 32:
+        for i in range(1, n):
+            tmp = order[i]
+            j = i
+            while j > 0 and lex_less(points, tmp, order[j - 1]):
+                order[j] = order[j - 1]
+                j -= 1
+            order[j] = tmp
+        return
+    for i in range(n // 2 - 1, -1, -1):
+        sift_down(points, order, i, n)
+    for i in range(n - 1, 0, -1):
+        tmp = order[0]
+        order[0] = order[i]
+        order[i] = tmp
+        sift_down(points, order, 0, i)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef void batch_monotone_chain(const double[:, ::1] points, const Py_ssize_t[::1] offsets, Py_ssize_t[::1] hull,
+                                Py_ssize_t[::1] counts, Py_ssize_t first, Py_ssize_t last) except *:
+    # 对第 first 到 last - 1 组点分别求凸包：第 g 组为 points[offsets[g]:offsets[g + 1]]
+    # 凸包下标（逆时针，从最左点开始）写入 hull[offsets[g]:]，顶点数写入 counts[g]
+    cdef Py_ssize_t g, i, n, k, lower, p, size = 0
+    if first < 0 or first > last or last >= offsets.shape[0] or counts.shape[0] < last:
+        raise ValueError("group range out of bounds")
+    if offsets[first] < 0 or offsets[last] > min(points.shape[0], hull.shape[0]):
+        raise ValueError("offsets out of bounds")
+    for g in range(first, last):
+        if offsets[g + 1] < offsets[g]:
+            raise ValueError("offsets must be non-decreasing")
+        size = max(size, offsets[g + 1] - offsets[g])
+    cdef Py_ssize_t *order = <Py_ssize_t *> malloc((3 * size + 2) * sizeof(Py_ssize_t))
+    if order == NULL:
+        raise MemoryError()
+    cdef Py_ssize_t *stack = order + size
+    cdef const double *pts = &points[0, 0] if points.shape[0] else NULL
+    with nogil:
+        for g in range(first, last):
+            n = offsets[g + 1] - offsets[g]
+            for i in range(n):
+                order[i] = offsets[g] + i
+            lex_sort(pts, order, n)
+            k = 0
+            for i in range(n):
+                p = order[i]
+                while k >= 2 and cross(pts, stack[k - 2], stack[k - 1], p) <= 0:
+                    k -= 1
+                stack[k] = p
+                k += 1
+            if n >= 2:
+                lower = k + 1
+                for i in range(n - 2, -1, -1):
+                    p = order[i]
+                    while k >= lower and cross(pts, stack[k - 2], stack[k - 1], p) <= 0:
+                        k -= 1
+                    stack[k] = p
+                    k += 1
+                k -= 1
+            for i in range(k):
+                hull[offsets[g] + i] = stack[i]
+            counts[g] = k
+    free(order)
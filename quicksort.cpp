@@ -1,19 +1,29 @@
 #include <random>
 #include <vector>
+#include <string>
+#include <mutex>
+#include <thread>
+#include <condition_variable>
+#include <cstdint>
 #include <algorithm>
+#include <type_traits>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
 namespace py = pybind11;
 
-int rand_partition(std::vector<int> &array, int p, int r) {
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_int_distribution<> dis(p, r);
-    auto i = dis(gen);
+std::mt19937 &generator() {
+    thread_local std::mt19937 gen(std::random_device{}());
+    return gen;
+}
+
+template<typename T>
+std::ptrdiff_t rand_partition(T *array, std::ptrdiff_t p, std::ptrdiff_t r) {
+    std::uniform_int_distribution<std::ptrdiff_t> dis(p, r);
+    auto i = dis(generator());
 
     std::swap(array[r], array[i]);
-    int x = array[r];
+    T x = array[r];
     i = p - 1;
     for (auto j = p; j < r; j++) {
         if (array[j] < x) {
@@ -25,7 +35,8 @@ int rand_partition(std::vector<int> &array, int p, int r) {
     return i + 1;
 }
 
-void quicksort_(std::vector<int> &array, int p, int r) {
+template<typename T>
+void quicksort_(T *array, std::ptrdiff_t p, std::ptrdiff_t r) {
     if (p < r) {
         auto q = rand_partition(array, p, r);
         quicksort_(array, p, q - 1);
@@ -34,32 +45,32 @@ void quicksort_(std::vector<int> &array, int p, int r) {
 }
 
 std::vector<int> quicksort(std::vector<int> array) {
-   quicksort_(array,0,array.size()-1);
-   return array;
+    quicksort_(array.data(), 0, (std::ptrdiff_t) array.size() - 1);
+    return array;
 }
 
-void insert_sort(std::vector<int> &array, int l, int r) {
-    for (int j = l; j <= r; j++) {
-        int key = array[j];
-        int i = j - 1;
-        for (; i >= 0 && key < array[i]; i--) {
+template<typename T>
+void insert_sort(T *array, std::ptrdiff_t l, std::ptrdiff_t r) {
+    for (auto j = l; j <= r; j++) {
+        T key = array[j];
+        auto i = j - 1;
+        for (; i >= l && key < array[i]; i--) {
             array[i + 1] = array[i];
         }
         array[i + 1] = key;
     }
 }
 
-std::pair<int, int> rand_partition_opt(std::vector<int> &array, int l, int r) {
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_int_distribution<> dis(l, r);
-    auto i = dis(gen);
+template<typename T>
+std::pair<std::ptrdiff_t, std::ptrdiff_t> rand_partition_opt(T *array, std::ptrdiff_t l, std::ptrdiff_t r) {
+    std::uniform_int_distribution<std::ptrdiff_t> dis(l, r);
+    auto i = dis(generator());
 
     // a[l] ? ? ? ? ? a[i] ? ? ? ? ? ? a[r] ->
     // a[l] ? ? ? ? ? a[r] ? ? ? ? ? ? a[i]
     std::swap(array[r], array[i]);
 
-    int x = array[r];
+    T x = array[r];
     i = r - 1;
     auto ml = l;
     auto mr = r;
@@ -76,7 +87,8 @@ std::pair<int, int> rand_partition_opt(std::vector<int> &array, int l, int r) {
     return std::make_pair(ml, mr);
 }
 
-void quicksort_opt_(std::vector<int> &array, int l, int r) {
+template<typename T>
+void quicksort_opt_(T *array, std::ptrdiff_t l, std::ptrdiff_t r) {
     if (r - l <= 16) {
         insert_sort(array, l, r);
     } else if (l < r) {
@@ -86,14 +98,71 @@ void quicksort_opt_(std::vector<int> &array, int l, int r) {
     }
 }
 
-std::vector<int> quicksort_opt(std::vector<int> array) {
-    quicksort_opt_(array, 0, array.size() - 1);
+// 并行版本：用 rand_partition_opt 划分，大于 cutoff 的子区间放入任务队列由线程池处理
+template<typename T>
+void parallel_quicksort_opt(T *array, std::ptrdiff_t n, unsigned threads, std::ptrdiff_t cutoff = 1 << 16) {
+    if (threads == 0) {
+        threads = std::max(1u, std::thread::hardware_concurrency());
+    }
+    if (threads == 1 || n <= cutoff) {
+        quicksort_opt_(array, 0, n - 1);
+        return;
+    }
+
+    std::mutex mutex;
+    std::condition_variable cv;
+    std::vector<std::pair<std::ptrdiff_t, std::ptrdiff_t>> tasks{{0, n - 1}};
+    std::size_t pending = 1;  // 已入队但尚未排好的区间数
+
+    auto worker = [&]() {
+        std::unique_lock<std::mutex> lock(mutex);
+        while (true) {
+            cv.wait(lock, [&] { return !tasks.empty() || pending == 0; });
+            if (tasks.empty()) {
+                return;
+            }
+            auto l = tasks.back().first, r = tasks.back().second;
+            tasks.pop_back();
+            lock.unlock();
+
+            // 左半交给其他线程，自己继续划分右半，直到区间足够小
+            while (r - l > cutoff) {
+                auto m = rand_partition_opt(array, l, r);
+                lock.lock();
+                tasks.emplace_back(l, m.first - 1);
+                pending++;
+                lock.unlock();
+                cv.notify_one();
+                l = m.second + 1;
+            }
+            quicksort_opt_(array, l, r);
+
+            lock.lock();
+            if (--pending == 0) {
+                cv.notify_all();
+            }
+        }
+    };
+
+    std::vector<std::thread> pool;
+    for (unsigned i = 1; i < threads; i++) {
+        pool.emplace_back(worker);
+    }
+    worker();
+    for (auto &thread: pool) {
+        thread.join();
+    }
+}
+
+std::vector<int> quicksort_opt(std::vector<int> array, unsigned threads) {
+    py::gil_scoped_release release;
+    parallel_quicksort_opt(array.data(), (std::ptrdiff_t) array.size(), threads);
     return array;
 }
 
 std::vector<int> cppsort(std::vector<int> array) {
-   std::sort(array.begin(), array.end());
-   return array;
+    std::sort(array.begin(), array.end());
+    return array;
 }
 
 int compare(const void *a, const void *b) {
@@ -105,10 +174,87 @@ std::vector<int> csort(std::vector<int> array) {
     return array;
 }
 
+// 把 NaN 移到末尾（与 np.sort 一致），返回非 NaN 部分的长度；NaN 不满足严格弱序，不能参与比较排序
+template<typename T>
+std::ptrdiff_t nan_last(T *array, std::ptrdiff_t n) {
+    if (!std::is_floating_point<T>::value) {
+        return n;
+    }
+    return std::partition(array, array + n, [](T x) { return x == x; }) - array;
+}
+
+// 缓冲区格式是否为本机字节序下的单个元素，如 "i"、"=d"、小端机器上的 "<q"
+bool native_format(const std::string &format, char &kind) {
+    std::uint16_t probe = 1;
+    bool little = *reinterpret_cast<unsigned char *>(&probe) == 1;
+    auto code = format;
+    if (!code.empty() && std::string("@=<>!").find(code[0]) != std::string::npos) {
+        auto order = code[0];
+        if ((order == '<' && !little) || ((order == '>' || order == '!') && little)) {
+            return false;
+        }
+        code = code.substr(1);
+    }
+    if (code.size() != 1) {
+        return false;
+    }
+    kind = code[0];
+    return true;
+}
+
+// 对一维连续的可写缓冲区（NumPy 数组、array.array 等）原地排序，排序期间释放 GIL
+template<typename Sort>
+void sort_buffer(py::buffer buffer, Sort sort) {
+    auto info = buffer.request(true);
+    if (info.ndim != 1 || (info.shape[0] > 1 && info.strides[0] != info.itemsize)) {
+        throw py::value_error("expected a contiguous one-dimensional buffer");
+    }
+    auto n = (std::ptrdiff_t) info.shape[0];
+    char kind = '\0';
+    bool native = native_format(info.format, kind);
+    bool integer = std::string("bhilq").find(kind) != std::string::npos;
+    bool floating = (kind == 'f' && info.itemsize == 4) || (kind == 'd' && info.itemsize == 8);
+    if (!native || (!floating && !(integer && (info.itemsize == 4 || info.itemsize == 8)))) {
+        throw py::type_error("unsupported buffer format '" + info.format +
+                             "', expected native-endian int32, int64, float32 or float64");
+    }
+
+    py::gil_scoped_release release;
+    if (integer && info.itemsize == 4) {
+        sort(static_cast<std::int32_t *>(info.ptr), n);
+    } else if (integer) {
+        sort(static_cast<std::int64_t *>(info.ptr), n);
+    } else if (kind == 'f') {
+        auto array = static_cast<float *>(info.ptr);
+        sort(array, nan_last(array, n));
+    } else {
+        auto array = static_cast<double *>(info.ptr);
+        sort(array, nan_last(array, n));
+    }
+}
+
+void quicksort_inplace(py::buffer buffer) {
+    sort_buffer(buffer, [](auto *array, std::ptrdiff_t n) { quicksort_(array, 0, n - 1); });
+}
+
+void quicksort_opt_inplace(py::buffer buffer, unsigned threads) {
+    sort_buffer(buffer, [threads](auto *array, std::ptrdiff_t n) { parallel_quicksort_opt(array, n, threads); });
+}
+
+void cppsort_inplace(py::buffer buffer) {
+    sort_buffer(buffer, [](auto *array, std::ptrdiff_t n) { std::sort(array, array + n); });
+}
+
 PYBIND11_MODULE(quicksort, m) {
     m.doc() = "quick sort"; // optional module docstring
     m.def("csort", &csort, "C qsort");
     m.def("cppsort", &cppsort, "C++ sort");
     m.def("quicksort", &quicksort, "A quick sort c++ extension");
-    m.def("quicksort_opt", &quicksort_opt, "A optimizerd quick sort c++ extension");
-}
\ No newline at end of file
+    m.def("quicksort_opt", &quicksort_opt, "A optimizerd quick sort c++ extension, threads=0 uses all cores",
+          py::arg("array"), py::arg("threads") = 1);
+    m.def("cppsort_inplace", &cppsort_inplace, "C++ sort on a writable buffer, in place");
+    m.def("quicksort_inplace", &quicksort_inplace, "quick sort on a writable buffer, in place");
+    m.def("quicksort_opt_inplace", &quicksort_opt_inplace,
+          "optimized quick sort on a writable buffer, in place, threads=0 uses all cores",
+          py::arg("buffer"), py::arg("threads") = 1);
+}
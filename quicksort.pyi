@@ -9,5 +9,17 @@ def quicksort(array):
     pass
 
 
-def quicksort_opt(array):
+def quicksort_opt(array, threads=1):
+    pass
+
+
+def cppsort_inplace(buffer):
+    pass
+
+
+def quicksort_inplace(buffer):
+    pass
+
+
+def quicksort_opt_inplace(buffer, threads=1):
     pass
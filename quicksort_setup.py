@@ -72,11 +72,11 @@ class BuildExt(build_ext):
     """A custom build extension for adding compiler-specific options."""
     c_opts = {
         'msvc': ['/EHsc'],
-        'unix': [],
+        'unix': ['-pthread'],
     }
     l_opts = {
         'msvc': [],
-        'unix': [],
+        'unix': ['-pthread'],
     }
 
     if sys.platform == 'darwin':
@@ -1,7 +1,8 @@
 import time
 import random
+import numpy as np
 import matplotlib.pyplot as plt
-from quicksort import csort, cppsort, quicksort, quicksort_opt
+from quicksort import csort, cppsort, quicksort, quicksort_opt, cppsort_inplace, quicksort_opt_inplace
 
 
 def exe_time(func):
@@ -19,6 +20,8 @@ csort = exe_time(csort)
 cppsort = exe_time(cppsort)
 quicksort = exe_time(quicksort)
 quicksort_opt = exe_time(quicksort_opt)
+cppsort_inplace = exe_time(cppsort_inplace)
+quicksort_opt_inplace = exe_time(quicksort_opt_inplace)
 
 
 def main():
@@ -28,6 +31,8 @@ def main():
     cpp_ts = []
     ext_ts = []
     opt_ts = []
+    inplace_ts = []
+    parallel_ts = []
     threshold = 7
     for percent in percents:
         repeated_ratio = 1 - percent / 10
@@ -45,9 +50,21 @@ def main():
 
         assert cpp_sorted_array == opt_sorted_array
 
+        # NumPy 数组原地排序，没有列表与 vector 之间的拷贝
+        inplace_array = np.array(source_array, dtype=np.int32)
+        _, inplace_t = quicksort_opt_inplace(inplace_array)
+        assert inplace_array.tolist() == opt_sorted_array
+
+        # 使用全部核心
+        parallel_array = np.array(source_array, dtype=np.int32)
+        _, parallel_t = quicksort_opt_inplace(parallel_array, threads=0)
+        assert parallel_array.tolist() == opt_sorted_array
+
         c_ts.append(c_t)
         cpp_ts.append(cpp_t)
         opt_ts.append(opt_t)
+        inplace_ts.append(inplace_t)
+        parallel_ts.append(parallel_t)
 
         if percent < threshold:
             ext_sorted_array, ext_t = quicksort(source_array)
@@ -61,6 +78,8 @@ def main():
     plt.plot(percents, c_ts, label='c')
     plt.plot(percents, cpp_ts, label='c++')
     plt.plot(percents, opt_ts, label='opt')
+    plt.plot(percents, inplace_ts, label='opt inplace')
+    plt.plot(percents, parallel_ts, label='opt parallel')
     plt.legend()
     plt.savefig("quicksort_opt")
     plt.show()